@@ -0,0 +1,55 @@
+"""
+Compares token verification done on every request with verified token cache
+for clients reusing their access tokens.
+
+Run from project root: python -m benchmarks.auth_benchmark
+"""
+import random
+import timeit
+import uuid
+
+from controllers.auth_controller import AuthController
+from services import auth_service
+from services.auth_service import TokenCache, decode_token
+
+USERS = 1000
+REQUESTS = 50_000
+
+
+def create_token() -> str:
+    return AuthController.create_access_token(
+        {
+            "id": uuid.uuid4(),
+            "username": "username",
+            "first_name": "first name",
+            "last_name": "last name",
+            "email": "user@example.com",
+            "disabled": False,
+        }
+    )
+
+
+def main():
+    tokens = [create_token() for _ in range(USERS)]
+    requests = [random.choice(tokens) for _ in range(REQUESTS)]
+
+    def authenticate():
+        for token in requests:
+            decode_token(token)
+
+    print(f"users: {USERS}, requests: {REQUESTS}")
+    auth_service.token_cache = TokenCache(0)
+    uncached_time = min(timeit.repeat(authenticate, number=1, repeat=3))
+    auth_service.token_cache = TokenCache(USERS)
+    cached_time = min(timeit.repeat(authenticate, number=1, repeat=3))
+    token_cache = auth_service.token_cache
+    print(
+        f"verify every request {uncached_time / REQUESTS * 1e6:.1f} us/request, "
+        f"token cache {cached_time / REQUESTS * 1e6:.1f} us/request, "
+        f"speedup {uncached_time / cached_time:.1f}x, "
+        f"hits {token_cache.hits}, misses {token_cache.misses}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Compares per call scorer of the game loop with vectorized rescoring.
+
+Run from project root: python -m benchmarks.rescoring_benchmark
+"""
+import random
+import timeit
+import uuid
+
+import numpy as np
+
+from controllers.game_controller import GameController
+from schemas.question_schema import QuestionTypeEnum
+from services.quiz_snapshot_service import (
+    AnswerSnapshot,
+    QuestionSnapshot,
+    QuizSnapshot,
+)
+from services.rescoring_service import rescoring_service
+
+QUESTIONS = 10
+ANSWERED_QUESTIONS = 200_000
+
+
+def create_snapshot() -> QuizSnapshot:
+    questions = []
+    for index in range(QUESTIONS):
+        answers = tuple(
+            AnswerSnapshot(id=uuid.uuid4(), value="answer") for _ in range(5)
+        )
+        if index % 2:
+            question_type = QuestionTypeEnum.MULTIPLE_ANSWERS.value
+            correct_answers = frozenset(answer.id for answer in answers[:2])
+        else:
+            question_type = QuestionTypeEnum.SINGLE_ANSWER.value
+            correct_answers = frozenset([answers[0].id])
+        questions.append(
+            QuestionSnapshot(
+                id=uuid.uuid4(),
+                title=f"question {index}",
+                type=question_type,
+                answers=answers,
+                correct_answers=correct_answers,
+                false_answers=frozenset(
+                    answer.id for answer in answers if answer.id not in correct_answers
+                ),
+            )
+        )
+    return QuizSnapshot(
+        quiz_id=uuid.uuid4(),
+        questions=tuple(questions),
+        questions_by_id={question.id: question for question in questions},
+    )
+
+
+def create_answers(snapshot: QuizSnapshot) -> list:
+    answers = []
+    for _ in range(ANSWERED_QUESTIONS):
+        question = random.choice(snapshot.questions)
+        choices_count = (
+            1 if question.type == QuestionTypeEnum.SINGLE_ANSWER.value else 2
+        )
+        choices = [
+            str(answer.id) for answer in random.sample(question.answers, choices_count)
+        ]
+        answers.append((question, choices))
+    return answers
+
+
+def main():
+    snapshot = create_snapshot()
+    answers = create_answers(snapshot)
+    answer_key = rescoring_service.build_answer_key(snapshot)
+
+    def per_call():
+        return [
+            GameController.calculate_answer_score(
+                [uuid.UUID(choice) for choice in choices], question
+            )
+            for question, choices in answers
+        ]
+
+    def vectorized():
+        question_indexes = np.fromiter(
+            (answer_key.question_indexes[question.id] for question, _ in answers),
+            dtype=np.intp,
+            count=len(answers),
+        )
+        choice_masks = np.fromiter(
+            (
+                rescoring_service.encode_choices(answer_key, choices)
+                for _, choices in answers
+            ),
+            dtype=np.uint8,
+            count=len(answers),
+        )
+        return rescoring_service.score_masks(answer_key, question_indexes, choice_masks)
+
+    question_indexes = np.fromiter(
+        (answer_key.question_indexes[question.id] for question, _ in answers),
+        dtype=np.intp,
+        count=len(answers),
+    )
+    choice_masks = np.fromiter(
+        (
+            rescoring_service.encode_choices(answer_key, choices)
+            for _, choices in answers
+        ),
+        dtype=np.uint8,
+        count=len(answers),
+    )
+
+    def vectorized_scoring_only():
+        return rescoring_service.score_masks(answer_key, question_indexes, choice_masks)
+
+    assert np.allclose(per_call(), vectorized())
+
+    per_call_time = min(timeit.repeat(per_call, number=1, repeat=5))
+    vectorized_time = min(timeit.repeat(vectorized, number=1, repeat=5))
+    scoring_only_time = min(timeit.repeat(vectorized_scoring_only, number=1, repeat=5))
+    print(f"answered questions: {ANSWERED_QUESTIONS}")
+    print(f"per call scorer: {per_call_time * 1000:.1f} ms")
+    print(f"vectorized scorer with encoding: {vectorized_time * 1000:.1f} ms")
+    print(f"vectorized scorer on encoded masks: {scoring_only_time * 1000:.1f} ms")
+    print(f"speedup: {per_call_time / vectorized_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Compares response model validation done by FastAPI with precompiled serializers
+for every schema served by fast response path.
+
+Run from project root: python -m benchmarks.serialization_benchmark
+"""
+import json
+import random
+import timeit
+import uuid
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_response_field
+
+from helpers.pagination_helper import Paginate
+from helpers.response_helper import ResponseSerializer
+from schemas.catalog_schema import CatalogResponse
+from schemas.game_schema import GameResponse, QuizGamesResponse
+from schemas.question_schema import QuestionResponse
+from schemas.quiz_schema import QuizResponse
+
+PAGES = 2000
+
+
+def create_quiz() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "title": "quiz title",
+        "published": True,
+        "created_at": datetime.now(timezone.utc),
+        "question_count": 10,
+        "games_started": random.randint(0, 1000),
+        "games_finished": random.randint(0, 1000),
+        "average_score": random.random() * 10,
+    }
+
+
+def create_question() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "title": "question title",
+        "type": "SINGLE_ANSWER",
+        "answers": [
+            {"id": uuid.uuid4(), "value": "answer", "is_correct": index == 0}
+            for index in range(5)
+        ],
+    }
+
+
+def create_game() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "title": "quiz title",
+        "finished": True,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def create_quiz_game() -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "finished": True,
+        "score": random.random() * 10,
+        "quiz_id": uuid.uuid4(),
+        "user_id": uuid.uuid4(),
+        "title": "quiz title",
+        "username": "username",
+    }
+
+
+def create_page(create_item, size: int = 15) -> dict:
+    return {
+        "total_count": 100,
+        "limit": size,
+        "offset": 0,
+        "next_cursor": None,
+        "items": [create_item() for _ in range(size)],
+    }
+
+
+CASES = [
+    (QuizResponse, create_quiz),
+    (Paginate[QuizResponse], lambda: create_page(create_quiz)),
+    (Paginate[QuestionResponse], lambda: create_page(create_question, 10)),
+    (Paginate[GameResponse], lambda: create_page(create_game)),
+    (Paginate[QuizGamesResponse], lambda: create_page(create_quiz_game)),
+    (
+        CatalogResponse,
+        lambda: {"items": [create_quiz() for _ in range(15)], "next_cursor": "c"},
+    ),
+]
+
+
+def main():
+    print(f"responses per schema: {PAGES}")
+    for schema, create_content in CASES:
+        contents = [create_content() for _ in range(PAGES)]
+        field = create_response_field(name=f"Response_{schema.__name__}", type_=schema)
+        serializer = ResponseSerializer(schema)
+
+        def validated():
+            for content in contents:
+                value, errors = field.validate(content, {}, loc=("response",))
+                JSONResponse(jsonable_encoder(value)).body
+
+        def precompiled():
+            for content in contents:
+                serializer.response(content).body
+
+        expected = JSONResponse(jsonable_encoder(schema.parse_obj(contents[0]))).body
+        assert json.loads(expected) == json.loads(serializer.response(contents[0]).body)
+
+        validated_time = min(timeit.repeat(validated, number=1, repeat=5))
+        precompiled_time = min(timeit.repeat(precompiled, number=1, repeat=5))
+        print(
+            f"{schema.__name__}: response model {validated_time * 1000:.1f} ms, "
+            f"precompiled serializer {precompiled_time * 1000:.1f} ms, "
+            f"speedup {validated_time / precompiled_time:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from sqlalchemy.orm import Session
+
+from helpers.pagination_helper import decode_rank_cursor, encode_rank_cursor
+from services.quiz_search_service import quiz_search_service
+
+
+class CatalogController:
+    @staticmethod
+    def search_quizzes(
+        session: Session, text: str, limit: int, cursor: str | None
+    ) -> dict:
+        """
+        Searches published quizzes by title and question titles
+        Args:
+            session: db session
+            text: searched text
+            limit: limit
+            cursor: next_cursor of previous page
+
+        Returns:
+            dict: most relevant quizzes and cursor of next page
+
+        """
+        after = decode_rank_cursor(cursor) if cursor else None
+        quizzes = quiz_search_service.search(session, text, limit + 1, after)
+        next_cursor = None
+        if len(quizzes) > limit:
+            quizzes = quizzes[:limit]
+            next_cursor = encode_rank_cursor(quizzes[-1].rank, quizzes[-1].id)
+        return {"items": quizzes, "next_cursor": next_cursor}
@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator
+
+from pydantic import UUID4
+from sqlalchemy.orm import Session, sessionmaker
+
+from controllers.quiz_controller import QuizController
+from models.game_answer_model import GameAnswer
+from models.game_model import Game
+from models.game_question_model import GameQuestion
+from models.question_model import Question
+from models.user_model import User
+from schemas.export_schema import ExportFormatEnum
+from services.db_service import db_service
+
+# number of rows fetched from server side cursor at once
+EXPORT_BATCH_SIZE = 1000
+CSV_COLUMNS = (
+    "game_id",
+    "user_id",
+    "username",
+    "finished",
+    "score",
+    "created_at",
+    "finished_at",
+    "question_id",
+    "question_title",
+    "answered",
+    "skipped",
+    "answer_score",
+    "choices",
+)
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class ExportController:
+    @staticmethod
+    def iterate_games(session: Session, quiz_id: UUID4) -> Iterator[dict]:
+        """
+        Retrieves games of the quiz one by one with their questions and choices,
+        rows are fetched in batches from server side cursor
+        Args:
+            session: db session
+            quiz_id: quiz id
+
+        Returns:
+            iterator of game dicts
+
+        """
+        rows = (
+            session.query(
+                Game.id.label("game_id"),
+                Game.user_id,
+                User.username,
+                Game.finished,
+                Game.score,
+                Game.created_at,
+                Game.finished_at,
+                GameQuestion.id.label("game_question_id"),
+                GameQuestion.question_id,
+                Question.title.label("question_title"),
+                GameQuestion.answered,
+                GameQuestion.skipped,
+                GameQuestion.answer_score,
+                GameAnswer.choice,
+            )
+            .join(User, User.id == Game.user_id)
+            .outerjoin(GameQuestion, GameQuestion.game_id == Game.id)
+            .outerjoin(Question, Question.id == GameQuestion.question_id)
+            .outerjoin(GameAnswer, GameAnswer.game_question_id == GameQuestion.id)
+            .filter(Game.quiz_id == quiz_id)
+            .order_by(Game.created_at, Game.id, GameQuestion.position)
+            .yield_per(EXPORT_BATCH_SIZE)
+        )
+        game = None
+        question = None
+        for row in rows:
+            if not game or game["game_id"] != row.game_id:
+                if game:
+                    yield game
+                game = {
+                    "game_id": row.game_id,
+                    "user_id": row.user_id,
+                    "username": row.username,
+                    "finished": row.finished,
+                    "score": row.score,
+                    "created_at": row.created_at,
+                    "finished_at": row.finished_at,
+                    "questions": [],
+                }
+                question = None
+            if not row.game_question_id:
+                continue
+            if not question or question["game_question_id"] != row.game_question_id:
+                question = {
+                    "game_question_id": row.game_question_id,
+                    "question_id": row.question_id,
+                    "title": row.question_title,
+                    "answered": row.answered,
+                    "skipped": row.skipped,
+                    "answer_score": row.answer_score,
+                    "choices": [],
+                }
+                game["questions"].append(question)
+            if row.choice is not None:
+                question["choices"].append(row.choice)
+        if game:
+            yield game
+
+    def export_ndjson(self, quiz_id: UUID4) -> Iterator[str]:
+        """
+        Streams games as JSON lines, one game per line
+        Args:
+            quiz_id: quiz id
+
+        Returns:
+            iterator of lines
+
+        """
+        with sessionmaker(bind=db_service.engine)() as session:
+            for game in self.iterate_games(session, quiz_id):
+                yield json.dumps(game, default=encode_value) + "\n"
+
+    def export_csv(self, quiz_id: UUID4) -> Iterator[str]:
+        """
+        Streams games as csv, one game question per row, choices are separated by `|`
+        Args:
+            quiz_id: quiz id
+
+        Returns:
+            iterator of csv chunks
+
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        with sessionmaker(bind=db_service.engine)() as session:
+            for game in self.iterate_games(session, quiz_id):
+                game_columns = [
+                    game["game_id"],
+                    game["user_id"],
+                    game["username"],
+                    game["finished"],
+                    game["score"],
+                    encode_value(game["created_at"]),
+                    game["finished_at"] and encode_value(game["finished_at"]),
+                ]
+                for question in game["questions"] or [{}]:
+                    writer.writerow(
+                        game_columns
+                        + [
+                            question.get("question_id"),
+                            question.get("title"),
+                            question.get("answered"),
+                            question.get("skipped"),
+                            question.get("answer_score"),
+                            "|".join(question.get("choices", [])),
+                        ]
+                    )
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def export_quiz_games(
+        self,
+        session: Session,
+        quiz_id: UUID4,
+        user_id: UUID4,
+        export_format: ExportFormatEnum,
+    ) -> Iterator[str]:
+        """
+        Checks quiz owner and prepares stream of quiz games.
+        Stream uses its own session as it outlives request session
+        Args:
+            session: db session
+            quiz_id: quiz id
+            user_id: authenticated user id
+            export_format: ndjson or csv
+
+        Returns:
+            iterator of exported chunks
+
+        """
+        quiz = QuizController.get_quiz_for_user(session, quiz_id, user_id)
+        if export_format == ExportFormatEnum.CSV:
+            return self.export_csv(quiz.id)
+        return self.export_ndjson(quiz.id)
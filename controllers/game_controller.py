@@ -1,31 +1,40 @@
+import uuid
+from concurrent.futures import Future
+from functools import partial
+
 from fastapi import HTTPException
 from pydantic import UUID4
-from sqlalchemy import update
+from sqlalchemy import bindparam, func, insert, select, update
 from sqlalchemy.orm import Session
 
-from controllers.question_controller import QuestionController
 from controllers.quiz_controller import QuizController
-from models.answer_model import Answer
+from helpers.pagination_helper import paginate, PaginateSchema
 from models.game_answer_model import GameAnswer
 from models.game_model import Game
 from models.game_question_model import GameQuestion
-from models.question_model import Question
 from models.quiz_model import Quiz
-from schemas.game_answer_schema import GameAnswerSchema
-from schemas.game_schema import GameStartSchema
+from schemas.game_answer_schema import GameAnswerSchema, GameSubmissionSchema
+from schemas.game_schema import GameStartSchema, FinalResultsResponse
 from schemas.question_schema import QuestionTypeEnum
+from services.leaderboard_service import leaderboard_service
+from services.progress_journal_service import progress_journal_service, ProgressEntry
+from services.quiz_snapshot_service import (
+    quiz_snapshot_service,
+    QuestionSnapshot,
+    QuizSnapshot,
+)
+from services.quiz_stats_service import quiz_stats_service
 
 
 class GameController:
     @staticmethod
-    def get_games(session: Session, user_id: UUID4, limit: int, offset: int) -> dict:
+    def get_games(session: Session, user_id: UUID4, pagination: PaginateSchema) -> dict:
         """
         Lists all games for user
         Args:
             session: db session,
             user_id: user_id for filtering
-            limit: limit
-            offset: offset
+            pagination: limit and offset or cursor
 
         Returns:
             list: games played by user
@@ -36,24 +45,23 @@ class GameController:
             .join(Quiz.games)
             .filter(Game.user_id == user_id)
         )
-        games = query.limit(limit).offset(offset).all()
-        return {
-            "total_count": query.count(),
-            "limit": limit,
-            "offset": offset,
-            "items": games,
-        }
+        return paginate(query, pagination, Game.created_at, Game.id)
 
     @staticmethod
     def start_game(
-        session: Session, game_body: GameStartSchema, user_id: UUID4
+        session: Session,
+        game_body: GameStartSchema,
+        user_id: UUID4,
+        questions: tuple[QuestionSnapshot, ...] | None = None,
     ) -> dict:
         """
-        Creates empty game with default values
+        Creates empty game with default values together with its questions.
+        Quiz with sample size gets random sample of its questions in every game
         Args:
             session: db session
             game_body: payload containing quiz_id
             user_id: authenticated user id
+            questions: questions of the game in order, drawn from quiz when not given
 
         Returns:
             id of started game
@@ -69,14 +77,36 @@ class GameController:
             .first()
         )
         if not game:
+            if questions is None:
+                snapshot = quiz_snapshot_service.get_snapshot(session, quiz.id)
+                questions = snapshot.sample_questions(quiz.sample_size)
             game = Game(
+                id=uuid.uuid4(),
                 finished=False,
                 score=0,
                 offset=0,
+                question_count=len(questions),
                 quiz_id=game_body.quiz_id,
                 user_id=user_id,
             )
             session.add(game)
+            session.flush()
+            quiz_stats_service.game_started(session, quiz.id)
+            session.execute(
+                insert(GameQuestion.__table__).values(
+                    [
+                        {
+                            "id": uuid.uuid4(),
+                            "answered": False,
+                            "skipped": False,
+                            "game_id": game.id,
+                            "question_id": question.id,
+                            "position": position,
+                        }
+                        for position, question in enumerate(questions)
+                    ]
+                )
+            )
             session.commit()
             return {"id": game.id}
         if game.finished:
@@ -97,8 +127,8 @@ class GameController:
 
         """
         game = (
-            session.query(*Quiz.__table__.columns, *Game.__table__.columns)
-            .join(Quiz.games)
+            session.query(*Game.__table__.columns)
+            .join(Quiz, Quiz.id == Game.quiz_id)
             .filter(Game.id == game_id)
             .filter(Game.user_id == user_id)
             .first()
@@ -107,28 +137,33 @@ class GameController:
             raise HTTPException(status_code=404, detail="Game not found")
         return game
 
-    @staticmethod
     def get_game_question(
-        session: Session, game_id: UUID4, question_id: UUID4
-    ) -> GameQuestion:
+        self, session: Session, game_id: UUID4, question_id: UUID4, user_id: UUID4
+    ):
         """
-        Retrieves info about answered question
+        Retrieves info about answered question together with its game
         Args:
             session: sqlalchemy session
             game_id: game id
             question_id: question id
+            user_id: authenticated user id
 
         Returns:
-            sqlalchemy GameQuestion object
+            row with GameQuestion columns, quiz_id and question_count of the game
 
         """
         game_question = (
-            session.query(GameQuestion)
+            session.query(
+                *GameQuestion.__table__.columns, Game.quiz_id, Game.question_count
+            )
+            .join(Game, Game.id == GameQuestion.game_id)
             .filter(GameQuestion.id == question_id)
             .filter(GameQuestion.game_id == game_id)
+            .filter(Game.user_id == user_id)
             .first()
         )
         if not game_question:
+            self.get_game(session, game_id, user_id)
             raise HTTPException(status_code=400, detail="Question not found for game")
         return game_question
 
@@ -147,36 +182,95 @@ class GameController:
         game = self.get_game(session, game_id, user_id)
         if game.finished:
             raise HTTPException(status_code=400, detail="Game is already finished")
-        question = QuestionController.paginate_questions(game.quiz_id, game.offset)
-        if not question:
-            session.execute(
-                update(Game).where(Game.id == game.id).values(finished=True)
-            )
+        snapshot = quiz_snapshot_service.get_snapshot(session, game.quiz_id)
+        if game.offset >= game.question_count:
+            self.finish_game(session, game_id, snapshot)
             session.commit()
             raise HTTPException(status_code=400, detail="Game is already finished")
 
         game_question = (
-            session.query(GameQuestion)
-            .filter(GameQuestion.question_id == question.id)
+            session.query(GameQuestion.id, GameQuestion.question_id)
             .filter(GameQuestion.game_id == game_id)
+            .filter(GameQuestion.position == game.offset)
             .first()
         )
-        if not game_question:
-            game_question = GameQuestion(
-                answered=False,
-                skipped=False,
-                game_id=game_id,
-                question_id=question.id,
-            )
-            session.add(game_question)
-            session.commit()
+        question = game_question and snapshot.get_question(game_question.question_id)
+        if not question:
+            raise HTTPException(status_code=400, detail="Question not found for game")
         return {
             "id": game_question.id,
             "type": question.type,
             "title": question.title,
-            "answers": [answer.__dict__ for answer in question.answers],
+            "answers": [
+                {"id": answer.id, "value": answer.value} for answer in question.answers
+            ],
         }
 
+    def get_game_questions(
+        self, session: Session, game_id: UUID4, user_id: UUID4
+    ) -> list:
+        """
+        Retrieves all questions left to answer in the game
+        Args:
+            session: db session
+            game_id: game id
+            user_id: authenticated user id
+
+        Returns:
+            list of questions details
+
+        """
+        game = self.get_game(session, game_id, user_id)
+        if game.finished:
+            raise HTTPException(status_code=400, detail="Game is already finished")
+        snapshot = quiz_snapshot_service.get_snapshot(session, game.quiz_id)
+        return [
+            {
+                "question_id": question.id,
+                "type": question.type,
+                "title": question.title,
+                "answers": [
+                    {"id": answer.id, "value": answer.value}
+                    for answer in question.answers
+                ],
+            }
+            for game_question, question in self.get_questions_of_game(
+                session, game_id, snapshot
+            )
+            if game_question.position >= game.offset
+        ]
+
+    @staticmethod
+    def get_questions_of_game(
+        session: Session, game_id: UUID4, snapshot: QuizSnapshot
+    ) -> list:
+        """
+        Retrieves game questions in order they are asked together with quiz questions
+        Args:
+            session: db session
+            game_id: game id
+            snapshot: snapshot of game quiz
+
+        Returns:
+            list of (game question row, QuestionSnapshot)
+
+        """
+        game_questions = (
+            session.query(
+                GameQuestion.id,
+                GameQuestion.question_id,
+                GameQuestion.position,
+                GameQuestion.answer_score,
+            )
+            .filter(GameQuestion.game_id == game_id)
+            .order_by(GameQuestion.position)
+        )
+        return [
+            (game_question, snapshot.get_question(game_question.question_id))
+            for game_question in game_questions
+            if game_question.question_id in snapshot.questions_by_id
+        ]
+
     @staticmethod
     def check_question_answered_or_skipped(game_question: GameQuestion) -> None:
         """
@@ -194,27 +288,21 @@ class GameController:
 
     @staticmethod
     def calculate_answer_score(
-        user_choices: list[UUID4], actual_answers: list[Answer], question_type: str
+        user_choices: list[UUID4], question: QuestionSnapshot
     ) -> float:
         """
         Calculates score for current answered question
         Args:
             user_choices: choices user made
-            actual_answers: actual answers stored in db
-            question_type: type of question
+            question: snapshot of question with precomputed answer sets
 
         Returns:
             float: score
 
         """
-        correct_answers_set = set()
-        false_answers_set = set()
-
-        for actual_answer in actual_answers:
-            if actual_answer.is_correct:
-                correct_answers_set.add(actual_answer.id)
-            else:
-                false_answers_set.add(actual_answer.id)
+        correct_answers_set = question.correct_answers
+        false_answers_set = question.false_answers
+        question_type = question.type
 
         if question_type == QuestionTypeEnum.SINGLE_ANSWER.value:
             if user_choices[0] in correct_answers_set:
@@ -243,6 +331,162 @@ class GameController:
 
         raise ValueError("Unknown question_type")
 
+    @staticmethod
+    def build_results(session: Session, game_id: UUID4, snapshot: QuizSnapshot) -> dict:
+        """
+        Builds final results document of the game
+        Args:
+            session: db session
+            game_id: game id
+            snapshot: snapshot of game quiz
+
+        Returns:
+            dict: score, score percentage and stats of every question
+
+        """
+        question_stats = [
+            {"answer_score": game_question.answer_score or 0, "title": question.title}
+            for game_question, question in GameController.get_questions_of_game(
+                session, game_id, snapshot
+            )
+        ]
+        score = sum(question_stat["answer_score"] for question_stat in question_stats)
+        return FinalResultsResponse(
+            score=score,
+            score_percentage=score / len(question_stats) * 100,
+            question_stats=question_stats,
+        ).dict()
+
+    def finish_game(
+        self, session: Session, game_id: UUID4, snapshot: QuizSnapshot
+    ) -> dict:
+        """
+        Marks game as finished and stores its final results
+        Args:
+            session: db session
+            game_id: game id
+            snapshot: snapshot of game quiz
+
+        Returns:
+            dict: final results
+
+        """
+        results = self.build_results(session, game_id, snapshot)
+        games = Game.__table__
+        previous_game = (
+            select(games.c.id, games.c.finished)
+            .where(games.c.id == game_id)
+            .with_for_update()
+            .cte("previous_game")
+        )
+        finished_game = session.execute(
+            update(games)
+            .where(games.c.id == previous_game.c.id)
+            .values(
+                finished=True,
+                finished_at=func.coalesce(games.c.finished_at, func.now()),
+                results=results,
+            )
+            .returning(
+                games.c.id,
+                games.c.quiz_id,
+                games.c.user_id,
+                games.c.score,
+                games.c.finished_at,
+                games.c.updated_at,
+                previous_game.c.finished.label("previously_finished"),
+            )
+        ).first()
+        if not finished_game.previously_finished:
+            quiz_stats_service.game_finished(
+                session, finished_game.quiz_id, finished_game.score
+            )
+        leaderboard_service.record_on_commit(session, finished_game)
+        return results
+
+    def save_question_progress(
+        self,
+        session: Session,
+        game_id: UUID4,
+        game_question_id: UUID4,
+        score: float,
+        choices: list[UUID4],
+        snapshot: QuizSnapshot,
+        question_count: int,
+        skipped: bool = False,
+    ) -> Future | None:
+        """
+        Marks question answered or skipped and moves game forward in one statement.
+        Only unanswered and not skipped question is updated, so repeated submits
+        can't change game score twice. Finishes game after its last question.
+        With write-behind enabled progress is handed to journal, which commits it
+        in batches and finishes game in same transaction as its last answer
+        Args:
+            session: db session
+            game_id: game id
+            game_question_id: game question id
+            score: score gained for the question
+            choices: choices user made
+            snapshot: snapshot of game quiz
+            question_count: number of game questions
+            skipped: whether question is skipped or answered
+
+        Returns:
+            future resolved once journal commits progress, None when it is committed
+
+        """
+        if progress_journal_service.enabled:
+            # request transaction is closed, so no connection is held while waiting
+            session.commit()
+            return progress_journal_service.submit(
+                ProgressEntry(
+                    game_id=game_id,
+                    game_question_id=game_question_id,
+                    score=score,
+                    choices=choices,
+                    skipped=skipped,
+                    question_count=question_count,
+                    finish=partial(
+                        self.finish_game, game_id=game_id, snapshot=snapshot
+                    ),
+                )
+            )
+
+        game_questions = GameQuestion.__table__
+        games = Game.__table__
+        updated_question = (
+            update(game_questions)
+            .where(game_questions.c.id == game_question_id)
+            .where(game_questions.c.game_id == game_id)
+            .where(game_questions.c.answered.is_(False))
+            .where(game_questions.c.skipped.is_(False))
+            .values(answered=not skipped, skipped=skipped, answer_score=score)
+            .returning(game_questions.c.game_id)
+            .cte("updated_question")
+        )
+        updated_game = session.execute(
+            update(games)
+            .where(games.c.id == updated_question.c.game_id)
+            .values(score=games.c.score + score, offset=games.c.offset + 1)
+            .returning(games.c.offset)
+        ).first()
+        if not updated_game:
+            session.rollback()
+            raise HTTPException(
+                status_code=400, detail="Question already answered or skipped"
+            )
+        if choices:
+            session.execute(
+                insert(GameAnswer.__table__),
+                [
+                    {"choice": choice, "game_question_id": game_question_id}
+                    for choice in choices
+                ],
+            )
+        if updated_game.offset >= question_count:
+            self.finish_game(session, game_id, snapshot)
+        session.commit()
+
     def answer_question(
         self,
         session: Session,
@@ -250,7 +494,7 @@ class GameController:
         game_id: UUID4,
         question_id: UUID4,
         user_id: UUID4,
-    ) -> None:
+    ) -> Future | None:
         """
         Saves info about answered question
         Args:
@@ -261,35 +505,35 @@ class GameController:
             user_id: authenticated user id
 
         Returns:
+            future resolved once progress is committed by journal, None without journal
 
         """
-        game = self.get_game(session, game_id, user_id)
-        game_question = self.get_game_question(session, game_id, question_id)
+        game_question = self.get_game_question(session, game_id, question_id, user_id)
         self.check_question_answered_or_skipped(game_question)
-        question = QuestionController.get_question(session, game_question.question_id)
+        snapshot = quiz_snapshot_service.get_snapshot(session, game_question.quiz_id)
+        question = snapshot.get_question(game_question.question_id)
+        if not question:
+            raise HTTPException(status_code=400, detail="Question not found")
         if question.type == QuestionTypeEnum.SINGLE_ANSWER.value:
             if len(answer_data.choices) > 1:
                 raise HTTPException(
                     status_code=400,
                     detail=f"{question.type} does not support multiple answers",
                 )
-        score = self.calculate_answer_score(
-            answer_data.choices, question.answers, question.type
+        score = self.calculate_answer_score(answer_data.choices, question)
+        return self.save_question_progress(
+            session,
+            game_id,
+            game_question.id,
+            score,
+            answer_data.choices,
+            snapshot,
+            game_question.question_count,
         )
-        session.execute(
-            update(Game)
-            .where(Game.id == game.id)
-            .values(score=game.score + score, offset=game.offset + 1)
-        )
-        game_question.answer_score = score
-        game_question.answered = True
-        for choice in answer_data.choices:
-            session.add(GameAnswer(choice=choice, game_question_id=game_question.id))
-        session.commit()
 
     def skip_question(
         self, session: Session, game_id: UUID4, question_id: UUID4, user_id: UUID4
-    ) -> None:
+    ) -> Future | None:
         """
         Skips question without modifying anything
         Args:
@@ -299,42 +543,211 @@ class GameController:
             user_id: authenticated user id
 
         Returns:
+            future resolved once progress is committed by journal, None without journal
 
         """
-        game = self.get_game(session, game_id, user_id)
-        game_question = self.get_game_question(session, game_id, question_id)
+        game_question = self.get_game_question(session, game_id, question_id, user_id)
         self.check_question_answered_or_skipped(game_question)
-        game_question.answer_score = 0
-        game_question.skipped = True
-        session.execute(
-            update(Game).where(Game.id == game.id).values(offset=game.offset + 1)
+        snapshot = quiz_snapshot_service.get_snapshot(session, game_question.quiz_id)
+        return self.save_question_progress(
+            session,
+            game_id,
+            game_question.id,
+            0,
+            [],
+            snapshot,
+            game_question.question_count,
+            skipped=True,
         )
+
+    def submit_game(
+        self,
+        session: Session,
+        submission_data: GameSubmissionSchema,
+        game_id: UUID4,
+        user_id: UUID4,
+    ) -> dict:
+        """
+        Answers or skips all questions left in the game and finishes it.
+        Questions missing from submission are considered skipped
+        Args:
+            session: db session
+            submission_data: answers and skips for the game questions
+            game_id: game id
+            user_id: authenticated user id
+
+        Returns:
+            final results of the game
+
+        """
+        game = self.get_game(session, game_id, user_id)
+        if game.finished:
+            raise HTTPException(status_code=400, detail="Game is already finished")
+        snapshot = quiz_snapshot_service.get_snapshot(session, game.quiz_id)
+        questions_of_game = self.get_questions_of_game(session, game_id, snapshot)
+        remaining_questions = [
+            (game_question, question)
+            for game_question, question in questions_of_game
+            if game_question.position >= game.offset
+        ]
+
+        submissions = {}
+        for submission in submission_data.answers:
+            if submission.question_id in submissions:
+                raise HTTPException(
+                    status_code=400, detail="Question submitted more than once"
+                )
+            submissions[submission.question_id] = submission
+        if submissions.keys() - {question.id for _, question in remaining_questions}:
+            raise HTTPException(status_code=400, detail="Question not found for game")
+
+        answer_scores = {
+            question.id: game_question.answer_score or 0
+            for game_question, question in questions_of_game
+        }
+        submitted_score = 0
+        updated_game_questions = []
+        game_answers = []
+        for game_question, question in remaining_questions:
+            submission = submissions.get(question.id)
+            skipped = not submission or submission.skipped
+            score = 0
+            if not skipped:
+                if not submission.choices:
+                    raise HTTPException(status_code=400, detail="Choices not provided")
+                if (
+                    question.type == QuestionTypeEnum.SINGLE_ANSWER.value
+                    and len(submission.choices) > 1
+                ):
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"{question.type} does not support multiple answers",
+                    )
+                score = self.calculate_answer_score(submission.choices, question)
+            answer_scores[question.id] = score
+            submitted_score += score
+
+            game_question_id = game_question.id
+            updated_game_questions.append(
+                {
+                    "game_question_id": game_question_id,
+                    "new_answered": not skipped,
+                    "new_skipped": skipped,
+                    "new_answer_score": score,
+                }
+            )
+            if not skipped:
+                game_answers.extend(
+                    {"choice": choice, "game_question_id": game_question_id}
+                    for choice in submission.choices
+                )
+
+        score = game.score + submitted_score
+        results = FinalResultsResponse(
+            score=score,
+            score_percentage=score / game.question_count * 100,
+            question_stats=[
+                {
+                    "answer_score": answer_scores.get(question.id, 0),
+                    "title": question.title,
+                }
+                for _, question in questions_of_game
+            ],
+        ).dict()
+
+        games = Game.__table__
+        game_questions = GameQuestion.__table__
+        updated_game = session.execute(
+            update(games)
+            .where(games.c.id == game_id)
+            .where(games.c.offset == game.offset)
+            .where(games.c.finished.is_(False))
+            .values(
+                score=games.c.score + submitted_score,
+                offset=game.question_count,
+                finished=True,
+                finished_at=func.now(),
+                results=results,
+            )
+            .returning(
+                games.c.id,
+                games.c.quiz_id,
+                games.c.user_id,
+                games.c.score,
+                games.c.finished_at,
+                games.c.updated_at,
+            )
+        ).first()
+        if not updated_game:
+            session.rollback()
+            raise HTTPException(
+                status_code=400, detail="Game progress has changed, try again"
+            )
+        quiz_stats_service.game_finished(
+            session, updated_game.quiz_id, updated_game.score
+        )
+        leaderboard_service.record_on_commit(session, updated_game)
+        if updated_game_questions:
+            session.execute(
+                update(game_questions)
+                .where(game_questions.c.id == bindparam("game_question_id"))
+                .values(
+                    answered=bindparam("new_answered"),
+                    skipped=bindparam("new_skipped"),
+                    answer_score=bindparam("new_answer_score"),
+                ),
+                updated_game_questions,
+            )
+        if game_answers:
+            session.execute(insert(GameAnswer.__table__), game_answers)
         session.commit()
+        return results
+
+    @staticmethod
+    def get_results_version(session: Session, game_id: UUID4, user_id: UUID4):
+        """
+        Retrieves version columns of user game, used to build ETag of results
+        Args:
+            session: db session
+            game_id: game id
+            user_id: authenticated user id
+
+        Returns:
+            row with finished flag and update time, None if game is not found
+
+        """
+        return (
+            session.query(Game.finished, Game.updated_at)
+            .filter(Game.id == game_id)
+            .filter(Game.user_id == user_id)
+            .first()
+        )
 
     def get_results(self, session: Session, game_id: UUID4, user_id: UUID4) -> dict:
         """
-        Retrieves final results of the finished game
+        Retrieves final results of the finished game, stored when game was finished
         Args:
             session: db session
             game_id: game id
             user_id: authenticated user id
 
         Returns:
+            dict: final results
 
         """
-        game = self.get_game(session, game_id, user_id)
+        game = (
+            session.query(Game.quiz_id, Game.finished, Game.results)
+            .filter(Game.id == game_id)
+            .filter(Game.user_id == user_id)
+            .first()
+        )
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
         if not game.finished:
             raise HTTPException(status_code=400, detail="Game is not finished yet")
-        question_stats = (
-            session.query(GameQuestion.answer_score, Question.title)
-            .join(Question, Question.id == GameQuestion.question_id)
-            .filter(GameQuestion.game_id == game_id)
-            .all()
-        )
-        max_score = len(question_stats)
-        score_percentage = game.score / max_score * 100
-        return {
-            "score": game.score,
-            "score_percentage": score_percentage,
-            "question_stats": question_stats,
-        }
+        if game.results:
+            return game.results
+        snapshot = quiz_snapshot_service.get_snapshot(session, game.quiz_id)
+        results = self.finish_game(session, game_id, snapshot)
+        session.commit()
+        return results
@@ -0,0 +1,333 @@
+import csv
+import io
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Iterator
+
+import psycopg2
+from fastapi import HTTPException
+from pydantic import UUID4, ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from controllers.question_controller import QuestionController
+from schemas.import_schema import ImportFormatEnum, ImportQuizSchema
+from schemas.question_schema import MAX_QUESTIONS_PER_GAME, QuestionSchema
+from services.quiz_search_service import quiz_search_service
+
+# quizzes are loaded with one COPY per table and committed together until their
+# questions reach this number, so chunk memory doesn't depend on quiz sizes
+IMPORT_CHUNK_QUESTIONS = 10000
+MAX_REPORTED_ERRORS = 100
+CSV_COLUMNS = ("quiz_title", "question_title", "type", "answers", "correct_answers")
+CSV_VALUE_SEPARATOR = "|"
+
+
+@dataclass
+class ImportReport:
+    imported_quizzes: int = 0
+    imported_questions: int = 0
+    error_count: int = 0
+    errors: list = field(default_factory=list)
+
+    def add_error(self, line: int, detail: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+
+class ImportController:
+    @staticmethod
+    def format_error(exc: Exception) -> str:
+        if isinstance(exc, HTTPException):
+            return str(exc.detail)
+        if isinstance(exc, ValidationError):
+            return "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+        return str(exc)
+
+    def read_jsonl(self, lines: Iterable[str], report: ImportReport) -> Iterator:
+        """
+        Reads quizzes from JSON lines, one quiz with its questions per line
+        Args:
+            lines: file lines
+            report: import report collecting invalid lines
+
+        Returns:
+            iterator of (line number, ImportQuizSchema)
+
+        """
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                quiz = ImportQuizSchema.parse_raw(line)
+                for question in quiz.questions:
+                    QuestionController.validate_answers(question.answers, question.type)
+            except (ValidationError, HTTPException) as exc:
+                report.add_error(line_number, self.format_error(exc))
+                continue
+            yield line_number, quiz
+
+    @staticmethod
+    def parse_csv_question(row: dict) -> QuestionSchema:
+        """
+        Parses question from csv row, answers are separated by `|`
+        and correct answers are listed by their positions starting from 1
+        Args:
+            row: csv row
+
+        Returns:
+            QuestionSchema object
+
+        """
+        values = (row.get("answers") or "").split(CSV_VALUE_SEPARATOR)
+        try:
+            correct_positions = {
+                int(position)
+                for position in (row.get("correct_answers") or "").split(
+                    CSV_VALUE_SEPARATOR
+                )
+                if position.strip()
+            }
+        except ValueError:
+            raise HTTPException(
+                status_code=400, detail="Correct answers must be answer positions"
+            )
+        if correct_positions - set(range(1, len(values) + 1)):
+            raise HTTPException(
+                status_code=400, detail="Correct answer position out of range"
+            )
+        question = QuestionSchema(
+            title=row.get("question_title") or "",
+            type=row.get("type") or "",
+            answers=[
+                {"value": value, "is_correct": position in correct_positions}
+                for position, value in enumerate(values, start=1)
+            ],
+        )
+        QuestionController.validate_answers(question.answers, question.type)
+        return question
+
+    def read_csv(self, lines: Iterable[str], report: ImportReport) -> Iterator:
+        """
+        Reads quizzes from csv, one question per row.
+        Consecutive rows with same quiz title are questions of one quiz
+        Args:
+            lines: file lines
+            report: import report collecting invalid rows
+
+        Returns:
+            iterator of (line number, ImportQuizSchema)
+
+        """
+        reader = csv.DictReader(lines)
+        missing_columns = set(CSV_COLUMNS) - set(reader.fieldnames or [])
+        if missing_columns:
+            report.add_error(
+                1, f"Missing columns: {', '.join(sorted(missing_columns))}"
+            )
+            return
+
+        quiz_line, quiz_title, questions = None, None, []
+        for row in reader:
+            line_number = reader.line_num
+            title = (row.get("quiz_title") or "").strip()
+            if title != quiz_title:
+                if questions:
+                    yield quiz_line, ImportQuizSchema(
+                        title=quiz_title, questions=questions
+                    )
+                quiz_line, quiz_title, questions = line_number, title, []
+            try:
+                if not title:
+                    raise HTTPException(status_code=400, detail="Quiz title is empty")
+                # csv has no sample size, so quiz must fit into one game
+                if len(questions) >= MAX_QUESTIONS_PER_GAME:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Maximum number of questions per quiz is {MAX_QUESTIONS_PER_GAME}",
+                    )
+                questions.append(self.parse_csv_question(row))
+            except (ValidationError, HTTPException) as exc:
+                report.add_error(line_number, self.format_error(exc))
+        if questions:
+            yield quiz_line, ImportQuizSchema(title=quiz_title, questions=questions)
+
+    @staticmethod
+    def copy_rows(cursor, table: str, columns: tuple, rows: list) -> None:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [
+                # bytea columns are written in hex format
+                [
+                    f"\\x{value.hex()}" if isinstance(value, bytes) else value
+                    for value in row
+                ]
+                for row in rows
+            ]
+        )
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+    def copy_chunk(
+        self, session: Session, chunk: list, user_id: UUID4, publish: bool
+    ) -> tuple[int, int]:
+        """
+        Loads quizzes with their questions and answers using COPY and commits them
+        Args:
+            session: db session
+            chunk: list of (line number, ImportQuizSchema)
+            user_id: owner of imported quizzes
+            publish: whether imported quizzes are published
+
+        Returns:
+            tuple: numbers of imported quizzes and questions
+
+        """
+        quiz_rows, question_rows, answer_rows = [], [], []
+        for _, quiz in chunk:
+            quiz_id = uuid.uuid4()
+            quiz_rows.append(
+                (
+                    quiz_id,
+                    quiz.title,
+                    publish,
+                    False,
+                    user_id,
+                    len(quiz.questions),
+                    quiz.sample_size,
+                )
+            )
+            for ordinal, question in enumerate(quiz.questions):
+                question_id = uuid.uuid4()
+                question_rows.append(
+                    (
+                        question_id,
+                        question.title,
+                        question.type.value,
+                        ordinal,
+                        quiz_id,
+                    )
+                )
+                answer_rows.extend(
+                    (uuid.uuid4(), answer.value, answer.is_correct, question_id)
+                    for answer in question.answers
+                )
+        cursor = session.connection().connection.cursor()
+        try:
+            self.copy_rows(
+                cursor,
+                "quizzes",
+                (
+                    "id",
+                    "title",
+                    "published",
+                    "deleted",
+                    "user_id",
+                    "question_count",
+                    "sample_size",
+                ),
+                quiz_rows,
+            )
+            self.copy_rows(
+                cursor,
+                "questions",
+                ("id", "title", "type", "ordinal", "quiz_id"),
+                question_rows,
+            )
+            self.copy_rows(
+                cursor,
+                "answers",
+                ("id", "value", "is_correct", "question_id"),
+                answer_rows,
+            )
+        finally:
+            cursor.close()
+        if publish:
+            quiz_search_service.index_quizzes(
+                session, [quiz_row[0] for quiz_row in quiz_rows]
+            )
+        session.commit()
+        return len(quiz_rows), len(question_rows)
+
+    def load_chunk(
+        self,
+        session: Session,
+        chunk: list,
+        user_id: UUID4,
+        publish: bool,
+        report: ImportReport,
+    ) -> None:
+        """
+        Loads chunk of quizzes in one transaction. When chunk is rejected because
+        of invalid data, its quizzes are loaded one by one and only invalid ones are reported
+        Args:
+            session: db session
+            chunk: list of (line number, ImportQuizSchema)
+            user_id: owner of imported quizzes
+            publish: whether imported quizzes are published
+            report: import report
+
+        """
+        try:
+            imported_quizzes, imported_questions = self.copy_chunk(
+                session, chunk, user_id, publish
+            )
+        except (psycopg2.Error, SQLAlchemyError) as exc:
+            session.rollback()
+            if len(chunk) > 1 and isinstance(
+                getattr(exc, "orig", exc), (psycopg2.DataError, psycopg2.IntegrityError)
+            ):
+                for item in chunk:
+                    self.load_chunk(session, [item], user_id, publish, report)
+                return
+            for line_number, _ in chunk:
+                report.add_error(line_number, f"Quiz could not be saved: {exc}")
+            return
+        report.imported_quizzes += imported_quizzes
+        report.imported_questions += imported_questions
+
+    def import_quizzes(
+        self,
+        session: Session,
+        lines: Iterable[str],
+        import_format: ImportFormatEnum,
+        user_id: UUID4,
+        publish: bool = False,
+    ) -> dict:
+        """
+        Imports quizzes from file in chunks, invalid rows are reported and skipped
+        Args:
+            session: db session
+            lines: file lines
+            import_format: jsonl or csv
+            user_id: owner of imported quizzes
+            publish: whether imported quizzes are published
+
+        Returns:
+            dict: import report with numbers of imported quizzes and errors
+
+        """
+        report = ImportReport()
+        read = (
+            self.read_csv if import_format == ImportFormatEnum.CSV else self.read_jsonl
+        )
+        chunk, chunk_questions = [], 0
+        try:
+            for item in read(lines, report):
+                chunk.append(item)
+                chunk_questions += len(item[1].questions)
+                if chunk_questions >= IMPORT_CHUNK_QUESTIONS:
+                    self.load_chunk(session, chunk, user_id, publish, report)
+                    chunk, chunk_questions = [], 0
+        except UnicodeDecodeError:
+            report.add_error(0, "File must be UTF-8 encoded, import stopped")
+        if chunk:
+            self.load_chunk(session, chunk, user_id, publish, report)
+        return asdict(report)
@@ -1,47 +1,90 @@
 from fastapi import HTTPException
 from pydantic import UUID4
+from sqlalchemy import bindparam, case, delete, insert, select, update
 from sqlalchemy.orm import Session
 
 from controllers.quiz_controller import QuizController
+from helpers.pagination_helper import PaginateSchema, dump_cursor, load_cursor
 from models.answer_model import Answer
 from models.question_model import Question
+from models.quiz_model import Quiz
 from schemas.question_schema import (
+    MAX_QUESTIONS_PER_BANK,
+    MAX_QUESTIONS_PER_GAME,
     QuestionsSchema,
     QuestionTypeEnum,
     UpdateQuestionSchema,
 )
+from services.quiz_stats_service import quiz_stats_service
 
 
 class QuestionController:
     @staticmethod
-    def get_questions(session: Session, quiz_id: UUID4, user_id: UUID4) -> dict:
+    def get_questions(
+        session: Session, quiz_id: UUID4, user_id: UUID4, pagination: PaginateSchema
+    ) -> dict:
         """
-        Retrieves questions from quiz
+        Retrieves page of quiz questions in their order. Question ordinals have no gaps,
+        so page is read by ordinal range and costs the same for any offset or cursor
         Args:
             session: db session
             quiz_id: quiz id
             user_id: authenticated user id
+            pagination: limit and offset or cursor
 
         Returns:
+            dict: page of questions with their answers
 
         """
         quiz = QuizController.get_quiz_for_user(session, quiz_id, user_id)
-        items = [
-            {
-                "id": question.id,
-                "title": question.title,
-                "type": question.type,
-                "answers": [answer.__dict__ for answer in question.answers],
-            }
-            for question in session.query(Question)
+        start = pagination.offset
+        if pagination.cursor:
+            try:
+                (start,) = load_cursor(pagination.cursor)
+                start = int(start)
+            except (ValueError, TypeError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        end = start + pagination.limit
+        rows = (
+            session.query(
+                Question.id,
+                Question.title,
+                Question.type,
+                Answer.id.label("answer_id"),
+                Answer.value,
+                Answer.is_correct,
+            )
+            .outerjoin(Answer, Answer.question_id == Question.id)
             .filter(Question.quiz_id == quiz.id)
+            .filter(Question.ordinal >= start)
+            .filter(Question.ordinal < end)
+            .order_by(Question.ordinal)
             .all()
-        ]
+        )
+        questions = {}
+        for row in rows:
+            question = questions.get(row.id)
+            if not question:
+                question = questions[row.id] = {
+                    "id": row.id,
+                    "title": row.title,
+                    "type": row.type,
+                    "answers": [],
+                }
+            if row.answer_id:
+                question["answers"].append(
+                    {
+                        "id": row.answer_id,
+                        "value": row.value,
+                        "is_correct": row.is_correct,
+                    }
+                )
         return {
-            "total_count": len(items),
-            "limit": len(items),
-            "offset": 0,
-            "items": items,
+            "total_count": quiz.question_count,
+            "limit": pagination.limit,
+            "offset": None if pagination.cursor else pagination.offset,
+            "next_cursor": dump_cursor([end]) if end < quiz.question_count else None,
+            "items": list(questions.values()),
         }
 
     @staticmethod
@@ -102,16 +145,28 @@ class QuestionController:
                 status_code=400,
                 detail="Can't add questions to already published quiz",
             )
-        if len(questions_data.questions) + len(quiz.questions) > 10:
+        # limit is checked against sample size stored in the row being updated
+        max_questions = case(
+            (Quiz.sample_size.is_(None), MAX_QUESTIONS_PER_GAME),
+            else_=MAX_QUESTIONS_PER_BANK,
+        )
+        questions_count = quiz_stats_service.add_questions(
+            session, quiz.id, len(questions_data.questions), max_questions
+        )
+        if questions_count is None:
             raise HTTPException(
                 status_code=400,
-                detail="Maximum number of questions per quiz is 10",
+                detail=f"Maximum number of questions is {MAX_QUESTIONS_PER_GAME} per quiz "
+                f"and {MAX_QUESTIONS_PER_BANK} per quiz with sample_size",
             )
-        for question_data in questions_data.questions:
+        for ordinal, question_data in enumerate(
+            questions_data.questions, start=questions_count
+        ):
             self.validate_answers(question_data.answers, question_data.type)
             question = Question(
                 title=question_data.title,
                 type=question_data.type.value,
+                ordinal=ordinal,
                 quiz_id=quiz.id,
                 answers=[
                     Answer(value=answer.value, is_correct=answer.is_correct)
@@ -119,12 +174,13 @@ class QuestionController:
                 ],
             )
             session.add(question)
+        quiz.content_version = Quiz.content_version + 1
         session.commit()
 
     @staticmethod
     def paginate_questions(session: Session, quiz_id: UUID4, offset: int) -> Question:
         """
-        Retrieves questions one by one
+        Retrieves questions one by one using question ordinal
         Args:
             session: db session
             quiz_id: quiz id
@@ -137,8 +193,7 @@ class QuestionController:
         return (
             session.query(Question)
             .filter(Question.quiz_id == quiz_id)
-            .limit(1)
-            .offset(offset)
+            .filter(Question.ordinal == offset)
             .first()
         )
 
@@ -162,9 +217,130 @@ class QuestionController:
                 status_code=400, detail="Can't delete question from published quiz"
             )
         question = self.get_question(session, question_id)
+        if question.quiz_id != quiz.id:
+            raise HTTPException(status_code=400, detail="Question not found")
         session.delete(question)
+        quiz_stats_service.remove_question(session, quiz.id)
+        session.execute(
+            update(Question)
+            .where(Question.quiz_id == quiz.id)
+            .where(Question.ordinal > question.ordinal)
+            .values(ordinal=Question.ordinal - 1)
+            .execution_options(synchronize_session=False)
+        )
+        quiz.content_version = Quiz.content_version + 1
         session.commit()
 
+    @staticmethod
+    def update_answers(
+        session: Session, question: Question, answers_data: list
+    ) -> None:
+        """
+        Replaces question answers by changing only rows which differ.
+        New answers are matched with current ones by id, then by value,
+        matched answers are updated, others are inserted or deleted
+        Args:
+            session: db session
+            question: sqlalchemy Question object
+            answers_data: list of UpdateAnswerSchema
+
+        """
+        current_answers = {answer.id: answer for answer in question.answers}
+        answers_by_value = {}
+        for answer in question.answers:
+            answers_by_value.setdefault(answer.value, []).append(answer)
+
+        matched_answers = []
+        unmatched_data = []
+        for answer_data in answers_data:
+            answer = current_answers.pop(answer_data.id, None)
+            if answer:
+                matched_answers.append((answer, answer_data))
+            else:
+                unmatched_data.append(answer_data)
+        new_answers = []
+        for answer_data in unmatched_data:
+            answer = next(
+                (
+                    answer
+                    for answer in answers_by_value.get(answer_data.value, [])
+                    if answer.id in current_answers
+                ),
+                None,
+            )
+            if answer:
+                del current_answers[answer.id]
+                matched_answers.append((answer, answer_data))
+            else:
+                new_answers.append(
+                    {
+                        "value": answer_data.value,
+                        "is_correct": answer_data.is_correct,
+                        "question_id": question.id,
+                    }
+                )
+
+        changed_answers = [
+            {
+                "answer_id": answer.id,
+                "new_value": answer_data.value,
+                "new_is_correct": answer_data.is_correct,
+            }
+            for answer, answer_data in matched_answers
+            if (answer.value, answer.is_correct)
+            != (answer_data.value, answer_data.is_correct)
+        ]
+        answers = Answer.__table__
+        if changed_answers:
+            session.execute(
+                update(answers)
+                .where(answers.c.id == bindparam("answer_id"))
+                .values(
+                    value=bindparam("new_value"),
+                    is_correct=bindparam("new_is_correct"),
+                ),
+                changed_answers,
+            )
+        if new_answers:
+            session.execute(insert(answers), new_answers)
+        if current_answers:
+            session.execute(
+                delete(answers).where(answers.c.id.in_(list(current_answers)))
+            )
+        session.expire(question, ["answers"])
+
+    @staticmethod
+    def purge_orphan_answers(session: Session, batch_size: int) -> int:
+        """
+        Deletes answers left without question by earlier versions of question
+        updates, every batch is committed separately
+        Args:
+            session: db session
+            batch_size: number of answers deleted at once
+
+        Returns:
+            int: number of deleted answers
+
+        """
+        answers = Answer.__table__
+        deleted_answers = 0
+        last_answer_id = None
+        while True:
+            query = select(answers.c.id).where(answers.c.question_id.is_(None))
+            if last_answer_id:
+                query = query.where(answers.c.id > last_answer_id)
+            answer_ids = (
+                session.execute(query.order_by(answers.c.id).limit(batch_size))
+                .scalars()
+                .all()
+            )
+            if not answer_ids:
+                return deleted_answers
+            session.execute(delete(answers).where(answers.c.id.in_(answer_ids)))
+            session.commit()
+            deleted_answers += len(answer_ids)
+            last_answer_id = answer_ids[-1]
+
     def update_question(
         self,
         session: Session,
@@ -191,12 +367,11 @@ class QuestionController:
                 status_code=400, detail="Can't update question from published quiz"
             )
         question = self.get_question(session, question_id)
+        if question.quiz_id != quiz.id:
+            raise HTTPException(status_code=404, detail="Question not found")
         if question_data.type and question_data.answers:
             self.validate_answers(question_data.answers, question_data.type)
-            question.answers = [
-                Answer(value=answer.value, is_correct=answer.is_correct)
-                for answer in question_data.answers
-            ]
+            self.update_answers(session, question, question_data.answers)
             question.type = question_data.type.value
         elif question_data.type and question_data.type != question.type:
             self.validate_answers(question.answers, question_data.type)
@@ -205,10 +380,8 @@ class QuestionController:
             self.validate_answers(
                 question_data.answers, QuestionTypeEnum[question.type]
             )
-            question.answers = [
-                Answer(value=answer.value, is_correct=answer.is_correct)
-                for answer in question_data.answers
-            ]
+            self.update_answers(session, question, question_data.answers)
         if question_data.title:
             question.title = question_data.title
+        quiz.content_version = Quiz.content_version + 1
         session.commit()
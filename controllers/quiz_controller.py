@@ -1,13 +1,19 @@
 from fastapi import HTTPException
 from pydantic import UUID4
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 
+from helpers.pagination_helper import paginate, PaginateSchema
 from models.game_model import Game
 from models.game_question_model import GameQuestion
 from models.question_model import Question
 from models.quiz_model import Quiz
 from models.user_model import User
+from schemas.question_schema import MAX_QUESTIONS_PER_GAME
 from schemas.quiz_schema import QuizSchema, UpdateQuizSchema
+from services.leaderboard_service import leaderboard_service
+from services.quiz_search_service import quiz_search_service
+from services.quiz_snapshot_service import quiz_snapshot_service
 
 
 class QuizController:
@@ -24,7 +30,12 @@ class QuizController:
             dict: containing quiz id
 
         """
-        quiz = Quiz(title=quiz_data.title, published=False, user_id=user_id)
+        quiz = Quiz(
+            title=quiz_data.title,
+            sample_size=quiz_data.sample_size,
+            published=False,
+            user_id=user_id,
+        )
         session.add(quiz)
         session.commit()
         return {"id": quiz.id}
@@ -76,6 +87,39 @@ class QuizController:
             raise HTTPException(status_code=404, detail="Quiz not found")
         return quiz
 
+    @staticmethod
+    def get_quiz_version(session: Session, quiz_id: UUID4, user_id: UUID4):
+        """
+        Retrieves version columns of quiz created by user, used to build ETags
+        without loading whole quiz
+        Args:
+            session: sqlalchemy session
+            quiz_id: quiz id
+            user_id: authenticated user id
+
+        Returns:
+            row with content version, published flag and game counters
+
+        """
+        version = (
+            session.query(
+                Quiz.published,
+                Quiz.content_version,
+                Quiz.games_started,
+                Quiz.games_finished,
+                Quiz.finished_score_sum,
+            )
+            .filter(
+                (Quiz.id == quiz_id)
+                & (Quiz.user_id == user_id)
+                & (Quiz.deleted.is_(False))
+            )
+            .first()
+        )
+        if not version:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        return version
+
     def get_quiz_details(
         self, session: Session, quiz_id: UUID4, user_id: UUID4
     ) -> Quiz:
@@ -93,31 +137,36 @@ class QuizController:
         return self.get_quiz_for_user(session, quiz_id, user_id)
 
     @staticmethod
-    def get_quizzes(session: Session, user_id: UUID4, limit: int, offset: int) -> dict:
+    def get_quizzes(
+        session: Session, user_id: UUID4, pagination: PaginateSchema
+    ) -> dict:
         """
         Retrieves quizzes created by user
         Args:
             session: db session
             user_id: authenticated user id
-            limit: limit
-            offset: offset
+            pagination: limit and offset or cursor
 
         Returns:
             list of Quiz objects
 
         """
         query = (
-            session.query(Quiz.id, Quiz.title, Quiz.published, Quiz.created_at)
+            session.query(
+                Quiz.id,
+                Quiz.title,
+                Quiz.published,
+                Quiz.created_at,
+                Quiz.question_count,
+                Quiz.sample_size,
+                Quiz.games_started,
+                Quiz.games_finished,
+                Quiz.average_score.label("average_score"),
+            )
             .filter(Quiz.user_id == user_id)
             .filter(Quiz.deleted.is_(False))
         )
-        quizzes = query.limit(limit).offset(offset).all()
-        return {
-            "total_count": query.count(),
-            "limit": limit,
-            "offset": offset,
-            "items": quizzes,
-        }
+        return paginate(query, pagination, Quiz.created_at, Quiz.id)
 
     def publish_quiz(self, session: Session, quiz_id: UUID4, user_id: UUID4) -> None:
         """
@@ -130,12 +179,15 @@ class QuizController:
 
         """
         quiz = self.get_quiz_for_user(session, quiz_id, user_id)
-        if len(quiz.questions) == 0:
+        if quiz.question_count == 0:
             raise HTTPException(
                 status_code=400, detail="Can't publish quiz without questions"
             )
         quiz.published = True
+        quiz.content_version = Quiz.content_version + 1
+        quiz_search_service.index_quizzes(session, [quiz.id])
         session.commit()
+        quiz_snapshot_service.get_snapshot(session, quiz.id)
 
     def delete_quiz(self, session: Session, quiz_id: UUID4, user_id: UUID4) -> None:
         """
@@ -150,7 +202,11 @@ class QuizController:
         """
         quiz = self.get_quiz_for_user(session, quiz_id, user_id)
         quiz.deleted = True
+        quiz.deleted_at = func.now()
+        quiz_search_service.remove_quiz(session, quiz.id)
         session.commit()
+        quiz_snapshot_service.invalidate(quiz.id)
+        leaderboard_service.invalidate(quiz.id)
 
     def update_quiz(
         self,
@@ -173,11 +229,36 @@ class QuizController:
         quiz = self.get_quiz_for_user(session, quiz_id, user_id)
         if quiz.published:
             raise HTTPException(status_code=400, detail="Can't update published quiz")
-        quiz.title = quiz_data.title
+        if quiz_data.title:
+            quiz.title = quiz_data.title
+        if "sample_size" in quiz_data.__fields_set__:
+            quizzes = Quiz.__table__
+            query = (
+                update(quizzes)
+                .where(quizzes.c.id == quiz.id)
+                .values(sample_size=quiz_data.sample_size)
+                .returning(quizzes.c.id)
+            )
+            if quiz_data.sample_size is None:
+                # quiz asking all its questions must fit into one game
+                query = query.where(quizzes.c.question_count <= MAX_QUESTIONS_PER_GAME)
+            updated_quiz = session.execute(query).first()
+            if not updated_quiz:
+                session.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Quiz with more than {MAX_QUESTIONS_PER_GAME} questions "
+                    f"must have sample_size",
+                )
+        quiz.content_version = Quiz.content_version + 1
         session.commit()
 
     def get_quiz_games(
-        self, session: Session, quiz_id: UUID4, user_id: UUID4, limit: int, offset: int
+        self,
+        session: Session,
+        quiz_id: UUID4,
+        user_id: UUID4,
+        pagination: PaginateSchema,
     ) -> dict:
         """
         Retrieves games played in the quiz
@@ -185,8 +266,7 @@ class QuizController:
             session: db session
             quiz_id: quiz id
             user_id: authenticated user id
-            limit: limit
-            offset: offset
+            pagination: limit and offset or cursor
 
         Returns:
             list of games played in the quiz
@@ -202,17 +282,90 @@ class QuizController:
                 Game.user_id,
                 Quiz.title,
                 User.username,
+                Game.created_at,
             )
             .join(Quiz, Game.quiz_id == Quiz.id)
             .join(User, Game.user_id == User.id)
             .filter(Game.quiz_id == quiz.id)
         )
-        games = query.limit(limit).offset(offset).all()
+        return paginate(query, pagination, Game.created_at, Game.id)
+
+    def get_published_quiz(self, session: Session, quiz_id: UUID4) -> Quiz:
+        """
+        Retrieves published quiz by id
+        Args:
+            session: sqlalchemy session
+            quiz_id: quiz id
+
+        Returns:
+            sqlalchemy Quiz object
+
+        """
+        quiz = self.get_quiz(session, quiz_id)
+        if not quiz.published:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        return quiz
+
+    def get_leaderboard(self, session: Session, quiz_id: UUID4, limit: int) -> dict:
+        """
+        Retrieves best finished games of the quiz
+        Args:
+            session: db session
+            quiz_id: quiz id
+            limit: number of games
+
+        Returns:
+            list of ranked games
+
+        """
+        quiz = self.get_published_quiz(session, quiz_id)
+        ranked_entries = leaderboard_service.top(session, quiz.id, limit)
+        usernames = dict(
+            session.query(User.id, User.username).filter(
+                User.id.in_([entry.user_id for _, entry in ranked_entries])
+            )
+        )
+        return {
+            "items": [
+                {
+                    "rank": rank,
+                    "game_id": entry.game_id,
+                    "user_id": entry.user_id,
+                    "username": usernames.get(entry.user_id, ""),
+                    "score": entry.score,
+                    "finished_at": entry.finished_at,
+                }
+                for rank, entry in ranked_entries
+            ]
+        }
+
+    def get_leaderboard_rank(
+        self, session: Session, quiz_id: UUID4, user_id: UUID4, username: str
+    ) -> dict:
+        """
+        Retrieves rank of authenticated user game in the quiz
+        Args:
+            session: db session
+            quiz_id: quiz id
+            user_id: authenticated user id
+            username: authenticated user username
+
+        Returns:
+            ranked game of the user
+
+        """
+        quiz = self.get_published_quiz(session, quiz_id)
+        ranked_entry = leaderboard_service.user_rank(session, quiz.id, user_id)
+        if not ranked_entry:
+            raise HTTPException(status_code=404, detail="Finished game not found")
+        rank, entry = ranked_entry
         return {
-            "total_count": query.count(),
-            "limit": limit,
-            "offset": offset,
-            "items": games,
+            "rank": rank,
+            "game_id": entry.game_id,
+            "user_id": entry.user_id,
+            "username": username,
+            "score": entry.score,
+            "finished_at": entry.finished_at,
         }
 
     def get_quiz_game_details(
@@ -231,11 +384,22 @@ class QuizController:
 
         """
         quiz = self.get_quiz_for_user(session, quiz_id, user_id)
+        game = (
+            session.query(Game.results)
+            .filter(Game.id == game_id)
+            .filter(Game.quiz_id == quiz.id)
+            .first()
+        )
+        if game and game.results:
+            return {
+                "question_stats": game.results["question_stats"],
+            }
         question_stats = (
             session.query(GameQuestion.answer_score, Question.title)
             .join(Question, Question.id == GameQuestion.question_id)
             .filter(GameQuestion.game_id == game_id)
             .filter(Question.quiz_id == quiz.id)
+            .filter(GameQuestion.answered.is_(True) | GameQuestion.skipped.is_(True))
             .all()
         )
         return {
@@ -0,0 +1,191 @@
+from functools import partial
+
+from fastapi import HTTPException
+from pydantic import UUID4
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from controllers.game_controller import GameController
+from controllers.quiz_controller import QuizController
+from models.game_model import Game
+from models.game_question_model import GameQuestion
+from schemas.auth_schema import UserDetails
+from schemas.game_schema import GameStartSchema
+from schemas.question_schema import QuestionTypeEnum
+from services.progress_journal_service import ProgressEntry, ProgressJournalService
+from services.quiz_snapshot_service import quiz_snapshot_service
+from services.room_service import room_service, Room, RoomPlayer
+
+
+class RoomController:
+    @staticmethod
+    def create_room(session: Session, quiz_id: UUID4, host_id: UUID4) -> dict:
+        """
+        Creates live room driven by host for published quiz
+        Args:
+            session: db session
+            quiz_id: quiz id
+            host_id: authenticated user id
+
+        Returns:
+            dict: containing room id
+
+        """
+        quiz = QuizController.get_quiz(session, quiz_id)
+        if not quiz.published:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        snapshot = quiz_snapshot_service.get_snapshot(session, quiz.id)
+        if not snapshot.questions:
+            raise HTTPException(status_code=400, detail="Quiz has no questions")
+        room = room_service.create_room(
+            host_id, snapshot, snapshot.sample_questions(quiz.sample_size)
+        )
+        return {"id": room.id}
+
+    @staticmethod
+    def join_room(session: Session, room: Room, user: UserDetails) -> RoomPlayer:
+        """
+        Starts game of the room quiz for user, rejoining user keeps its game and score.
+        Questions closed before user joined are skipped in the new game.
+        Must be called with room lock held, so room question doesn't change meanwhile
+        Args:
+            session: db session
+            room: room
+            user: authenticated user
+
+        Returns:
+            RoomPlayer object
+
+        """
+        if room.finished:
+            raise HTTPException(status_code=400, detail="Room is already finished")
+        player = room.players.get(user.id)
+        if player:
+            return player
+        existing_game = (
+            session.query(Game.finished)
+            .filter(Game.quiz_id == room.snapshot.quiz_id)
+            .filter(Game.user_id == user.id)
+            .first()
+        )
+        if existing_game:
+            # solo game has its own questions, so it can't be continued in the room
+            raise HTTPException(
+                status_code=400,
+                detail="You already played this game"
+                if existing_game.finished
+                else "Finish your game of this quiz before joining room",
+            )
+        game = GameController.start_game(
+            session,
+            GameStartSchema(quiz_id=room.snapshot.quiz_id),
+            user.id,
+            room.questions,
+        )
+        closed_questions = room.closed_questions
+        if closed_questions > 0:
+            game_questions = GameQuestion.__table__
+            session.execute(
+                update(game_questions)
+                .where(game_questions.c.game_id == game["id"])
+                .where(game_questions.c.position < closed_questions)
+                .values(answered=False, skipped=True, answer_score=0)
+            )
+            games = Game.__table__
+            session.execute(
+                update(games)
+                .where(games.c.id == game["id"])
+                .values(offset=closed_questions)
+            )
+            if closed_questions >= len(room.questions):
+                GameController().finish_game(session, game["id"], room.snapshot)
+            session.commit()
+        game_question_ids = dict(
+            session.query(GameQuestion.question_id, GameQuestion.id).filter(
+                GameQuestion.game_id == game["id"]
+            )
+        )
+        return RoomPlayer(
+            user_id=user.id,
+            username=user.username,
+            game_id=game["id"],
+            game_question_ids=game_question_ids,
+            question_count=len(game_question_ids),
+        )
+
+    @staticmethod
+    def answer_question(room: Room, user_id: UUID4, choices: list[UUID4]) -> None:
+        """
+        Scores player answer for current room question, answers are saved when question closes
+        Args:
+            room: room
+            user_id: authenticated user id
+            choices: choices user made
+
+        Returns:
+
+        """
+        if user_id not in room.players:
+            raise HTTPException(status_code=400, detail="Join room before answering")
+        if not room.question_open:
+            raise HTTPException(status_code=400, detail="Question is closed")
+        if user_id in room.answers:
+            raise HTTPException(status_code=400, detail="Question already answered")
+        question = room.question
+        if not choices:
+            raise HTTPException(status_code=400, detail="Choices are required")
+        if question.type == QuestionTypeEnum.SINGLE_ANSWER.value and len(choices) > 1:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{question.type} does not support multiple answers",
+            )
+        score = GameController.calculate_answer_score(choices, question)
+        room.answers[user_id] = (score, choices)
+
+    @staticmethod
+    def save_question_answers(session: Session, room: Room, answers: dict) -> None:
+        """
+        Saves answers of closed question for all players in one batch,
+        players who didn't answer skip the question. Finishes games after last question,
+        every game in its own savepoint. Player scores change only after commit
+        Args:
+            session: db session
+            room: room
+            answers: (score, choices) of players keyed by user id
+
+        Returns:
+
+        """
+        question = room.question
+        game_controller = GameController()
+        entries = {}
+        for player in room.players.values():
+            game_question_id = player.game_question_ids.get(question.id)
+            if not game_question_id:
+                continue
+            score, choices = answers.get(player.user_id, (0, []))
+            entries[player.user_id] = ProgressEntry(
+                game_id=player.game_id,
+                game_question_id=game_question_id,
+                score=score,
+                choices=choices,
+                skipped=player.user_id not in answers,
+                question_count=player.question_count,
+                finish=partial(
+                    game_controller.finish_game,
+                    game_id=player.game_id,
+                    snapshot=room.snapshot,
+                ),
+            )
+        offsets = ProgressJournalService.save_progress_batch(
+            session, list(entries.values())
+        )
+        ProgressJournalService.finish_games(
+            session,
+            {entry.game_question_id: entry for entry in entries.values()},
+            offsets,
+        )
+        session.commit()
+        for user_id, entry in entries.items():
+            if entry.game_question_id in offsets:
+                room.players[user_id].score += entry.score
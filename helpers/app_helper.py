@@ -1,17 +1,35 @@
 import logging
 
 from services.db_service import db_service
+from services.progress_journal_service import progress_journal_service
 from services.logger_service import set_log_configuration
+from services.quiz_stats_service import quiz_stats_service
+from services.room_service import room_service
 
 set_log_configuration()
 
 logger = logging.getLogger(__name__)
 
 
+async def startup_event():
+    """
+    On application startup starts removal of inactive rooms and applying of quiz counters
+    """
+    room_service.start()
+    quiz_stats_service.start()
+
+
 async def shutdown_event():
     """
-    On application shutdown disposes sqlalchemy engine
+    On application shutdown flushes progress journal, applies pending quiz counters
+    and disposes sqlalchemy engine
     """
+    room_service.stop()
+    logger.info("Flushing Progress Journal")
+    progress_journal_service.stop()
+    logger.info("Applying Quiz Counters")
+    quiz_stats_service.stop()
     logger.info("Disposing DB Engine")
     db_service.dispose_engine()
+    await db_service.dispose_async_engine()
     logger.info("DB Engine Dispose Finished")
@@ -0,0 +1,75 @@
+import hashlib
+
+from fastapi import Header, Response
+
+from settings import app_config
+
+# immutable resources are cached by browsers, other resources are revalidated every time
+IMMUTABLE_CACHE_CONTROL = (
+    f"private, max-age={int(app_config.get('IMMUTABLE_CACHE_SECONDS', 86400))}"
+)
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds strong ETag from resource version
+    Args:
+        *parts: values which change whenever response changes
+
+    Returns:
+        str: quoted ETag
+    """
+    version = "/".join(str(part) for part in parts)
+    return f'"{hashlib.sha256(version.encode()).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks If-None-Match header, weak comparison is used as required for GET requests
+    Args:
+        if_none_match: If-None-Match header
+        etag: current ETag
+
+    Returns:
+        bool: whether client has current version
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(",")
+    )
+
+
+def set_cache_headers(response: Response, etag: str, cache_control: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+class ConditionalRequest:
+    def __init__(self, if_none_match: str | None):
+        self.if_none_match = if_none_match
+
+    def not_modified(self, etag: str, cache_control: str) -> Response | None:
+        """
+        Returns 304 response if client has current version of resource
+        Args:
+            etag: current ETag
+            cache_control: Cache-Control header of the resource
+
+        Returns:
+            304 response or None when response must be built
+        """
+        if not etag_matches(self.if_none_match, etag):
+            return None
+        response = Response(status_code=304)
+        set_cache_headers(response, etag, cache_control)
+        return response
+
+
+def conditional_request(
+    if_none_match: str | None = Header(None, alias="If-None-Match")
+) -> ConditionalRequest:
+    return ConditionalRequest(if_none_match)
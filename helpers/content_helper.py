@@ -0,0 +1,34 @@
+import hashlib
+import json
+from typing import Iterable
+
+# 128 bits are enough to tell copies apart and keep keys of shared texts small
+CONTENT_HASH_SIZE = 16
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+def question_content_hash(title: str, question_type: str, answers: Iterable) -> bytes:
+    """
+    Hashes question content, questions copied between quizzes get same hash.
+    Whitespace is collapsed and answers are sorted, so their order doesn't matter
+    Args:
+        title: question title
+        question_type: question type
+        answers: pairs of answer value and is_correct
+
+    Returns:
+        bytes: sha256 digest truncated to CONTENT_HASH_SIZE bytes
+    """
+    content = [
+        normalize_text(title),
+        question_type,
+        sorted(
+            [normalize_text(value), bool(is_correct)] for value, is_correct in answers
+        ),
+    ]
+    return hashlib.sha256(
+        json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    ).digest()[:CONTENT_HASH_SIZE]
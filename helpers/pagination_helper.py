@@ -1,13 +1,24 @@
+import base64
+import binascii
+import json
+import uuid
 from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
 
 import pydantic
-from fastapi import Query
+from fastapi import HTTPException, Query
+from sqlalchemy import func, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query as SQLQuery
+from sqlalchemy.sql.expression import ClauseElement, Executable
 
 
 class BasePaginate(pydantic.BaseModel):
-    total_count: int
+    total_count: int | None
     limit: int
-    offset: int
+    offset: int | None
+    next_cursor: str | None
 
 
 class Paginate:
@@ -17,14 +28,183 @@ class Paginate:
         )
 
 
+class TotalCountEnum(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
 @dataclass
 class PaginateSchema:
     limit: int
     offset: int
+    cursor: str | None = None
+    total: TotalCountEnum = TotalCountEnum.EXACT
 
 
 def pagination_parameters(
     limit: int = Query(15, ge=1, le=20),
     offset: int = 0,
+    cursor: str | None = Query(None, description="next_cursor of previous page"),
+    total: TotalCountEnum = Query(
+        TotalCountEnum.EXACT,
+        description="`estimated` uses planner statistics, `none` skips total_count",
+    ),
 ):
-    return PaginateSchema(limit=limit, offset=offset)
+    return PaginateSchema(limit=limit, offset=offset, cursor=cursor, total=total)
+
+
+def dump_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def load_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_cursor(created_at: datetime, id_: uuid.UUID) -> str:
+    """
+    Encodes position of the last item of the page as opaque cursor
+    Args:
+        created_at: item creation time
+        id_: item id
+
+    Returns:
+        str: url safe cursor
+    """
+    return dump_cursor([created_at.isoformat(), str(id_)])
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Decodes cursor created by encode_cursor
+    Args:
+        cursor: cursor
+
+    Returns:
+        tuple: creation time and id of the last item of previous page
+    """
+    try:
+        created_at, id_ = load_cursor(cursor)
+        return datetime.fromisoformat(created_at), uuid.UUID(id_)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_rank_cursor(rank: float, id_: uuid.UUID) -> str:
+    """
+    Encodes position of the last item of page ordered by relevance
+    Args:
+        rank: item relevance
+        id_: item id
+
+    Returns:
+        str: url safe cursor
+    """
+    return dump_cursor([rank, str(id_)])
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    """
+    Decodes cursor created by encode_rank_cursor
+    Args:
+        cursor: cursor
+
+    Returns:
+        tuple: relevance and id of the last item of previous page
+    """
+    try:
+        rank, id_ = load_cursor(cursor)
+        return float(rank), uuid.UUID(id_)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element, compiler, **kwargs):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+def estimate_count(query: SQLQuery) -> int:
+    """
+    Estimates number of query rows from planner statistics without running query
+    Args:
+        query: filtered query
+
+    Returns:
+        int: estimated number of rows
+    """
+    plan = query.session.execute(Explain(query.order_by(None).statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(
+    query: SQLQuery, pagination: PaginateSchema, created_at_column, id_column
+) -> dict:
+    """
+    Retrieves page of query results from newest to oldest. With cursor page starts
+    right after the item cursor points to, so deep pages cost the same as first one
+    Args:
+        query: filtered query, its rows must contain created_at and id columns
+        pagination: pagination parameters
+        created_at_column: creation time column used for ordering
+        id_column: id column used for ordering
+
+    Returns:
+        dict: page with items, next_cursor and total_count.
+        Exact total of offset page is counted by window function in same query
+    """
+    page_query = query.order_by(created_at_column.desc(), id_column.desc())
+    if pagination.cursor:
+        created_at, id_ = decode_cursor(pagination.cursor)
+        page_query = page_query.filter(
+            tuple_(created_at_column, id_column) < tuple_(created_at, id_)
+        )
+    else:
+        page_query = page_query.offset(pagination.offset)
+    page_query = page_query.limit(pagination.limit + 1)
+
+    total_count = None
+    if pagination.total == TotalCountEnum.EXACT and not pagination.cursor:
+        items = page_query.add_columns(func.count().over().label("total_count")).all()
+        if items:
+            total_count = items[0].total_count
+        elif pagination.offset:
+            total_count = query.order_by(None).count()
+        else:
+            total_count = 0
+    else:
+        items = page_query.all()
+        if pagination.total == TotalCountEnum.EXACT:
+            total_count = query.order_by(None).count()
+        elif pagination.total == TotalCountEnum.ESTIMATED:
+            total_count = estimate_count(query)
+            if not pagination.cursor and len(items) <= pagination.limit:
+                # last page, total is known exactly
+                total_count = pagination.offset + len(items)
+
+    next_cursor = None
+    if len(items) > pagination.limit:
+        items = items[: pagination.limit]
+        next_cursor = encode_cursor(
+            getattr(items[-1], created_at_column.key), getattr(items[-1], id_column.key)
+        )
+    return {
+        "total_count": total_count,
+        "limit": pagination.limit,
+        "offset": None if pagination.cursor else pagination.offset,
+        "next_cursor": next_cursor,
+        "items": items,
+    }
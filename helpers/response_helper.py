@@ -0,0 +1,97 @@
+import uuid
+from collections.abc import Mapping
+from datetime import date, datetime
+from enum import Enum
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ValidationError
+from pydantic.fields import ModelField, SHAPE_LIST, SHAPE_SINGLETON
+
+# values of these types are written by orjson same way as pydantic would write them
+PASSTHROUGH_TYPES = (str, int, float, bool, uuid.UUID, datetime, date)
+
+
+def is_passthrough(field: ModelField) -> bool:
+    if field.class_validators or field.shape != SHAPE_SINGLETON:
+        return False
+    return issubclass(field.type_, PASSTHROUGH_TYPES) or issubclass(field.type_, Enum)
+
+
+class ResponseSerializer:
+    """
+    Serializes route results to JSON without validating them with response model.
+    Field converters are compiled once per schema, only fields with validators
+    or types orjson can't write are validated, so output matches response model
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.validate_model = bool(
+            schema.__pre_root_validators__ or schema.__post_root_validators__
+        )
+        self.fields = [
+            (field.name, field.alias, field.default, self.compile_field(field))
+            for field in schema.__fields__.values()
+        ]
+
+    def compile_field(self, field: ModelField) -> Callable | None:
+        """
+        Creates converter of field value
+        Args:
+            field: pydantic field
+
+        Returns:
+            converter or None when value is written as it is
+        """
+        if self.validate_model or is_passthrough(field):
+            return None
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            nested = ResponseSerializer(field.type_)
+            if field.shape == SHAPE_SINGLETON:
+                return lambda value: None if value is None else nested.serialize(value)
+            if field.shape == SHAPE_LIST:
+                return lambda value: (
+                    None
+                    if value is None
+                    else [nested.serialize(item) for item in value]
+                )
+        schema = self.schema
+
+        def validate(value):
+            value, errors = field.validate(value, {}, loc=field.alias, cls=schema)
+            if errors:
+                raise ValidationError([errors], schema)
+            return jsonable_encoder(value)
+
+        return validate
+
+    def serialize(self, item) -> dict:
+        """
+        Converts dict, sqlalchemy row or object to JSON compatible dict
+        Args:
+            item: route result
+
+        Returns:
+            dict: response model fields by alias
+        """
+        if isinstance(item, Mapping):
+            values = {
+                alias: item.get(name, default)
+                for name, alias, default, _ in self.fields
+            }
+        else:
+            values = {
+                alias: getattr(item, name, default)
+                for name, alias, default, _ in self.fields
+            }
+        if self.validate_model:
+            return jsonable_encoder(self.schema.parse_obj(values), by_alias=True)
+        for _, alias, _, convert in self.fields:
+            if convert:
+                values[alias] = convert(values[alias])
+        return values
+
+    def response(self, content, **kwargs) -> ORJSONResponse:
+        return ORJSONResponse(self.serialize(content), **kwargs)
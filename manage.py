@@ -0,0 +1,135 @@
+import argparse
+import logging
+import uuid
+
+from services.logger_service import set_log_configuration
+
+set_log_configuration()
+
+logger = logging.getLogger(__name__)
+
+
+def rescore(args):
+    from services.rescoring_service import rescoring_service
+
+    rescored_games = rescoring_service.rescore_quiz(args.quiz_id, args.batch_size)
+    logger.info(f"Rescoring finished, {rescored_games} games rescored")
+
+
+def purge_idempotency_keys(args):
+    from services.idempotency_service import PostgresIdempotencyStore
+
+    deleted_keys = PostgresIdempotencyStore.purge_expired()
+    logger.info(f"Purged {deleted_keys} expired idempotency keys")
+
+
+def import_quizzes(args):
+    from sqlalchemy.orm import sessionmaker
+
+    from controllers.import_controller import ImportController
+    from services.db_service import db_service
+
+    with open(args.path, encoding="utf-8", newline="") as file, sessionmaker(
+        bind=db_service.engine
+    )() as session:
+        report = ImportController().import_quizzes(
+            session, file, args.format, args.user_id, args.publish
+        )
+    for error in report["errors"]:
+        logger.warning(f"Line {error['line']}: {error['detail']}")
+    logger.info(
+        f"Imported {report['imported_quizzes']} quizzes with "
+        f"{report['imported_questions']} questions, {report['error_count']} errors"
+    )
+
+
+def archive_quizzes(args):
+    from services.quiz_archive_service import quiz_archive_service
+
+    archived_quizzes = quiz_archive_service.archive_deleted_quizzes(args.batch_size)
+    logger.info(f"Archiving finished, {archived_quizzes} quizzes archived")
+
+
+def restore_quiz(args):
+    from fastapi import HTTPException
+    from sqlalchemy.orm import sessionmaker
+
+    from services.db_service import db_service
+    from services.quiz_archive_service import quiz_archive_service
+
+    with sessionmaker(bind=db_service.engine)() as session:
+        try:
+            quiz_archive_service.restore_quiz(session, args.quiz_id, args.undelete)
+        except HTTPException as exc:
+            logger.error(exc.detail)
+            return
+    logger.info(f"Quiz {args.quiz_id} restored")
+
+
+def purge_orphan_answers(args):
+    from sqlalchemy.orm import sessionmaker
+
+    from controllers.question_controller import QuestionController
+    from services.db_service import db_service
+
+    with sessionmaker(bind=db_service.engine)() as session:
+        deleted_answers = QuestionController.purge_orphan_answers(
+            session, args.batch_size
+        )
+    logger.info(f"Purged {deleted_answers} orphan answers")
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(description="Quiz API management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rescore_parser = subparsers.add_parser(
+        "rescore", help="Recalculate scores of all games played in the quiz"
+    )
+    rescore_parser.add_argument("quiz_id", type=uuid.UUID)
+    rescore_parser.add_argument("--batch-size", type=int, default=1000)
+    rescore_parser.set_defaults(handler=rescore)
+
+    purge_parser = subparsers.add_parser(
+        "purge-idempotency-keys", help="Delete expired idempotency keys from DB"
+    )
+    purge_parser.set_defaults(handler=purge_idempotency_keys)
+
+    import_parser = subparsers.add_parser(
+        "import-quizzes", help="Import quizzes from JSON lines or csv file"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--user-id", type=uuid.UUID, required=True, help="owner of imported quizzes"
+    )
+    import_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    import_parser.add_argument("--publish", action="store_true")
+    import_parser.set_defaults(handler=import_quizzes)
+
+    archive_parser = subparsers.add_parser(
+        "archive-quizzes",
+        help="Move deleted quizzes with their games from hot tables to archive",
+    )
+    archive_parser.add_argument("--batch-size", type=int, default=100)
+    archive_parser.set_defaults(handler=archive_quizzes)
+
+    restore_parser = subparsers.add_parser(
+        "restore-quiz", help="Move archived quiz with its games back to hot tables"
+    )
+    restore_parser.add_argument("quiz_id", type=uuid.UUID)
+    restore_parser.add_argument(
+        "--undelete", action="store_true", help="also mark quiz as not deleted"
+    )
+    restore_parser.set_defaults(handler=restore_quiz)
+
+    orphans_parser = subparsers.add_parser(
+        "purge-orphan-answers", help="Delete answers which don't belong to question"
+    )
+    orphans_parser.add_argument("--batch-size", type=int, default=1000)
+    orphans_parser.set_defaults(handler=purge_orphan_answers)
+    return parser
+
+
+if __name__ == "__main__":
+    arguments = create_parser().parse_args()
+    arguments.handler(arguments)
@@ -0,0 +1,73 @@
+"""add quiz counters
+
+Revision ID: 0a8e6c4b9d27
+Revises: f7c3a1d8e2b6
+Create Date: 2026-10-18 20:34:09.512873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0a8e6c4b9d27"
+down_revision = "f7c3a1d8e2b6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "quizzes",
+        sa.Column("question_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "quizzes",
+        sa.Column("games_started", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "quizzes",
+        sa.Column("games_finished", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "quizzes",
+        sa.Column("finished_score_sum", sa.Float(), server_default="0", nullable=False),
+    )
+    conn = op.get_bind()
+    conn.execute(
+        """
+        update quizzes
+        set question_count = question_stats.question_count
+        from (
+            select quiz_id, count(*) as question_count
+            from questions
+            group by quiz_id
+        ) as question_stats
+        where quizzes.id = question_stats.quiz_id;
+        """
+    )
+    conn.execute(
+        """
+        update quizzes
+        set games_started = game_stats.games_started,
+            games_finished = game_stats.games_finished,
+            finished_score_sum = game_stats.finished_score_sum
+        from (
+            select quiz_id,
+                   count(*) as games_started,
+                   count(*) filter (where finished is true) as games_finished,
+                   coalesce(sum(score) filter (where finished is true), 0)
+                       as finished_score_sum
+            from games
+            group by quiz_id
+        ) as game_stats
+        where quizzes.id = game_stats.quiz_id;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("quizzes", "finished_score_sum")
+    op.drop_column("quizzes", "games_finished")
+    op.drop_column("quizzes", "games_started")
+    op.drop_column("quizzes", "question_count")
@@ -0,0 +1,65 @@
+"""add quiz search columns
+
+Revision ID: 1b9d3f5e7a40
+Revises: 0a8e6c4b9d27
+Create Date: 2026-10-18 21:07:26.184530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "1b9d3f5e7a40"
+down_revision = "0a8e6c4b9d27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "quizzes", sa.Column("search_vector", postgresql.TSVECTOR(), nullable=True)
+    )
+    op.add_column("quizzes", sa.Column("search_text", sa.Text(), nullable=True))
+    conn = op.get_bind()
+    conn.execute(
+        """
+        update quizzes
+        set search_vector = setweight(to_tsvector('english', quizzes.title), 'A')
+                || setweight(to_tsvector('english', question_titles.titles), 'B'),
+            search_text = quizzes.title || ' ' || question_titles.titles
+        from (
+            select quizzes.id as quiz_id,
+                   coalesce(string_agg(questions.title, ' '), '') as titles
+            from quizzes
+            left join questions on questions.quiz_id = quizzes.id
+            where quizzes.published is true and quizzes.deleted is false
+            group by quizzes.id
+        ) as question_titles
+        where quizzes.id = question_titles.quiz_id;
+        """
+    )
+    op.create_index(
+        "ix_quizzes_search_vector",
+        "quizzes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_quizzes_search_text_trgm",
+        "quizzes",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quizzes_search_text_trgm", table_name="quizzes")
+    op.drop_index("ix_quizzes_search_vector", table_name="quizzes")
+    op.drop_column("quizzes", "search_text")
+    op.drop_column("quizzes", "search_vector")
@@ -0,0 +1,94 @@
+"""add quiz archives
+
+Revision ID: 2c4e6a8b0d13
+Revises: 1b9d3f5e7a40
+Create Date: 2026-10-18 22:14:05.726341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "2c4e6a8b0d13"
+down_revision = "1b9d3f5e7a40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_archives",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("game_count", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_quiz_archives_user_id"), "quiz_archives", ["user_id"], unique=False
+    )
+    op.add_column(
+        "quizzes", sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    op.drop_index("ix_quizzes_deleted", table_name="quizzes")
+    op.create_index(
+        "ix_quizzes_deleted_at",
+        "quizzes",
+        ["deleted_at"],
+        unique=False,
+        postgresql_where=sa.text("deleted IS true"),
+    )
+    op.drop_index("ix_quizzes_search_text_trgm", table_name="quizzes")
+    op.drop_index("ix_quizzes_search_vector", table_name="quizzes")
+    op.create_index(
+        "ix_quizzes_search_vector",
+        "quizzes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_where=sa.text("published IS true AND deleted IS false"),
+    )
+    op.create_index(
+        "ix_quizzes_search_text_trgm",
+        "quizzes",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+        postgresql_where=sa.text("published IS true AND deleted IS false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_quizzes_search_text_trgm", table_name="quizzes")
+    op.drop_index("ix_quizzes_search_vector", table_name="quizzes")
+    op.create_index(
+        "ix_quizzes_search_vector",
+        "quizzes",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_quizzes_search_text_trgm",
+        "quizzes",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+    op.drop_index("ix_quizzes_deleted_at", table_name="quizzes")
+    op.create_index("ix_quizzes_deleted", "quizzes", ["deleted"], unique=False)
+    op.drop_column("quizzes", "deleted_at")
+    op.drop_index(op.f("ix_quiz_archives_user_id"), table_name="quiz_archives")
+    op.drop_table("quiz_archives")
@@ -0,0 +1,27 @@
+"""add quiz content version
+
+Revision ID: 3d5f7b9c1e24
+Revises: 2c4e6a8b0d13
+Create Date: 2026-10-18 22:41:32.508917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3d5f7b9c1e24"
+down_revision = "2c4e6a8b0d13"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "quizzes",
+        sa.Column("content_version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("quizzes", "content_version")
@@ -0,0 +1,43 @@
+"""add question ordinal
+
+Revision ID: 3f9a1c7e2b54
+Revises: 66c56ce8d341
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3f9a1c7e2b54"
+down_revision = "66c56ce8d341"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("questions", sa.Column("ordinal", sa.Integer(), nullable=True))
+    conn = op.get_bind()
+    conn.execute(
+        """
+        update questions
+        set ordinal = numbered.ordinal
+        from (
+            select id, row_number() over (partition by quiz_id order by ctid) - 1 as ordinal
+            from questions
+        ) as numbered
+        where questions.id = numbered.id;
+        """
+    )
+    op.create_index(
+        "ix_questions_quiz_id_ordinal",
+        "questions",
+        ["quiz_id", "ordinal"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_quiz_id_ordinal", table_name="questions")
+    op.drop_column("questions", "ordinal")
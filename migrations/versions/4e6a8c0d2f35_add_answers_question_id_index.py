@@ -0,0 +1,25 @@
+"""add answers question id index
+
+Revision ID: 4e6a8c0d2f35
+Revises: 3d5f7b9c1e24
+Create Date: 2026-10-18 23:02:48.193675
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "4e6a8c0d2f35"
+down_revision = "3d5f7b9c1e24"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        op.f("ix_answers_question_id"), "answers", ["question_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_answers_question_id"), table_name="answers")
@@ -0,0 +1,65 @@
+"""add question sampling
+
+Revision ID: 5f7b9d1e3a46
+Revises: 4e6a8c0d2f35
+Create Date: 2026-10-18 23:26:14.850392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5f7b9d1e3a46"
+down_revision = "4e6a8c0d2f35"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("quizzes", sa.Column("sample_size", sa.Integer(), nullable=True))
+    op.add_column("games", sa.Column("question_count", sa.Integer(), nullable=True))
+    op.add_column("game_questions", sa.Column("position", sa.Integer(), nullable=True))
+    conn = op.get_bind()
+    conn.execute(
+        """
+        update game_questions
+        set position = positions.position
+        from (
+            select game_questions.id,
+                   row_number() over (
+                       partition by game_questions.game_id
+                       order by questions.ordinal, game_questions.id
+                   ) - 1 as position
+            from game_questions
+            join questions on questions.id = game_questions.question_id
+        ) as positions
+        where game_questions.id = positions.id;
+        """
+    )
+    conn.execute(
+        """
+        update games
+        set question_count = coalesce(
+            (
+                select count(*)
+                from game_questions
+                where game_questions.game_id = games.id
+            ),
+            0
+        );
+        """
+    )
+    op.create_index(
+        "ix_game_questions_game_id_position",
+        "game_questions",
+        ["game_id", "position"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_game_questions_game_id_position", table_name="game_questions")
+    op.drop_column("game_questions", "position")
+    op.drop_column("games", "question_count")
+    op.drop_column("quizzes", "sample_size")
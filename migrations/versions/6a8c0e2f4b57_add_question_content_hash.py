@@ -0,0 +1,97 @@
+"""add question content hash
+
+Revision ID: 6a8c0e2f4b57
+Revises: 5f7b9d1e3a46
+Create Date: 2026-10-18 23:58:41.207615
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "6a8c0e2f4b57"
+down_revision = "5f7b9d1e3a46"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def question_content_hash(title: str, question_type: str, answers: list) -> bytes:
+    # copy of hash used by the application when this revision was written,
+    # so later changes of application code don't change backfilled values
+    def normalize_text(text: str) -> str:
+        return " ".join(text.split())
+
+    content = [
+        normalize_text(title),
+        question_type,
+        sorted(
+            [normalize_text(value), bool(is_correct)] for value, is_correct in answers
+        ),
+    ]
+    return hashlib.sha256(
+        json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    ).digest()[:16]
+
+
+def upgrade() -> None:
+    op.add_column(
+        "questions", sa.Column("content_hash", sa.LargeBinary(length=16), nullable=True)
+    )
+    conn = op.get_bind()
+    questions = sa.table(
+        "questions",
+        sa.column("id"),
+        sa.column("title"),
+        sa.column("type"),
+        sa.column("content_hash"),
+    )
+    answers = sa.table(
+        "answers", sa.column("value"), sa.column("is_correct"), sa.column("question_id")
+    )
+    last_question_id = None
+    while True:
+        query = sa.select(questions.c.id, questions.c.title, questions.c.type)
+        if last_question_id:
+            query = query.where(questions.c.id > last_question_id)
+        rows = conn.execute(
+            query.order_by(questions.c.id).limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        question_answers = {}
+        for answer in conn.execute(
+            sa.select(
+                answers.c.question_id, answers.c.value, answers.c.is_correct
+            ).where(answers.c.question_id.in_([row.id for row in rows]))
+        ):
+            question_answers.setdefault(answer.question_id, []).append(
+                (answer.value or "", answer.is_correct)
+            )
+        conn.execute(
+            sa.update(questions)
+            .where(questions.c.id == sa.bindparam("question_id"))
+            .values(content_hash=sa.bindparam("new_content_hash")),
+            [
+                {
+                    "question_id": row.id,
+                    "new_content_hash": question_content_hash(
+                        row.title or "",
+                        row.type or "",
+                        question_answers.get(row.id, []),
+                    ),
+                }
+                for row in rows
+            ],
+        )
+        last_question_id = rows[-1].id
+    op.create_index("ix_questions_content_hash", "questions", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_content_hash", table_name="questions")
+    op.drop_column("questions", "content_hash")
@@ -0,0 +1,40 @@
+"""add quiz stat deltas
+
+Revision ID: 7b9d1f3a5c68
+Revises: 6a8c0e2f4b57
+Create Date: 2026-10-18 23:59:30.418206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "7b9d1f3a5c68"
+down_revision = "6a8c0e2f4b57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_stat_deltas",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("games_started", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("games_finished", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("finished_score_sum", sa.Float(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_quiz_stat_deltas_quiz_id"),
+        "quiz_stat_deltas",
+        ["quiz_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_quiz_stat_deltas_quiz_id"), table_name="quiz_stat_deltas")
+    op.drop_table("quiz_stat_deltas")
@@ -0,0 +1,38 @@
+"""index games by updated_at
+
+Revision ID: 8c0e2f4a6d79
+Revises: 7b9d1f3a5c68
+Create Date: 2026-10-19 00:12:05.731942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8c0e2f4a6d79"
+down_revision = "7b9d1f3a5c68"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_games_quiz_id_updated_at",
+        "games",
+        ["quiz_id", "updated_at"],
+        unique=False,
+        postgresql_where=sa.text("finished IS true"),
+    )
+    op.drop_index("ix_games_quiz_id_finished_at", table_name="games")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_games_quiz_id_finished_at",
+        "games",
+        ["quiz_id", "finished_at"],
+        unique=False,
+        postgresql_where=sa.text("finished IS true"),
+    )
+    op.drop_index("ix_games_quiz_id_updated_at", table_name="games")
@@ -0,0 +1,29 @@
+"""drop question content hash
+
+Revision ID: 9d1f3b5c7e80
+Revises: 8c0e2f4a6d79
+Create Date: 2026-10-19 00:26:48.109356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "9d1f3b5c7e80"
+down_revision = "8c0e2f4a6d79"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_questions_content_hash", table_name="questions")
+    op.drop_column("questions", "content_hash")
+
+
+def downgrade() -> None:
+    # hashes of existing questions are not backfilled on downgrade
+    op.add_column(
+        "questions", sa.Column("content_hash", sa.LargeBinary(length=16), nullable=True)
+    )
+    op.create_index("ix_questions_content_hash", "questions", ["content_hash"])
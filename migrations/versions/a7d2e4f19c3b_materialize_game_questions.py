@@ -0,0 +1,44 @@
+"""materialize game questions
+
+Revision ID: a7d2e4f19c3b
+Revises: 3f9a1c7e2b54
+Create Date: 2026-10-18 11:04:27.912356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7d2e4f19c3b"
+down_revision = "3f9a1c7e2b54"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_game_questions_game_id_question_id",
+        "game_questions",
+        ["game_id", "question_id"],
+        unique=False,
+    )
+    conn = op.get_bind()
+    conn.execute(
+        """
+        insert into game_questions (id, answered, skipped, game_id, question_id)
+        select gen_random_uuid(), false, false, games.id, questions.id
+        from games
+        join questions on questions.quiz_id = games.quiz_id
+        where games.finished is not true
+        and not exists (
+            select 1 from game_questions
+            where game_questions.game_id = games.id
+            and game_questions.question_id = questions.id
+        );
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_game_questions_game_id_question_id", table_name="game_questions")
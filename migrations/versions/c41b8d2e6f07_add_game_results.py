@@ -0,0 +1,28 @@
+"""add game results
+
+Revision ID: c41b8d2e6f07
+Revises: a7d2e4f19c3b
+Create Date: 2026-10-18 11:52:03.471968
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "c41b8d2e6f07"
+down_revision = "a7d2e4f19c3b"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "games",
+        sa.Column("results", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("games", "results")
@@ -0,0 +1,50 @@
+"""add game finished_at and leaderboard indexes
+
+Revision ID: d93e5a0b7c18
+Revises: c41b8d2e6f07
+Create Date: 2026-10-18 12:38:55.204716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d93e5a0b7c18"
+down_revision = "c41b8d2e6f07"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "games", sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True)
+    )
+    conn = op.get_bind()
+    conn.execute(
+        """
+        update games
+        set finished_at = coalesce(updated_at, created_at)
+        where finished is true;
+        """
+    )
+    op.create_index(
+        "ix_games_quiz_id_score_finished_at",
+        "games",
+        ["quiz_id", sa.text("score DESC"), "finished_at"],
+        unique=False,
+        postgresql_where=sa.text("finished IS true"),
+    )
+    op.create_index(
+        "ix_games_quiz_id_finished_at",
+        "games",
+        ["quiz_id", "finished_at"],
+        unique=False,
+        postgresql_where=sa.text("finished IS true"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_games_quiz_id_finished_at", table_name="games")
+    op.drop_index("ix_games_quiz_id_score_finished_at", table_name="games")
+    op.drop_column("games", "finished_at")
@@ -0,0 +1,44 @@
+"""add indexes for cursor pagination
+
+Revision ID: f7c3a1d8e2b6
+Revises: e5b7f2a9c301
+Create Date: 2026-10-18 19:58:12.640391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f7c3a1d8e2b6"
+down_revision = "e5b7f2a9c301"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_quizzes_user_id_created_at_id",
+        "quizzes",
+        ["user_id", "created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("deleted IS false"),
+    )
+    op.create_index(
+        "ix_games_user_id_created_at_id",
+        "games",
+        ["user_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_games_quiz_id_created_at_id",
+        "games",
+        ["quiz_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_games_quiz_id_created_at_id", table_name="games")
+    op.drop_index("ix_games_user_id_created_at_id", table_name="games")
+    op.drop_index("ix_quizzes_user_id_created_at_id", table_name="quizzes")
@@ -12,4 +12,4 @@ class Answer(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     value = Column(String)
     is_correct = Column(Boolean)
-    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"))
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"), index=True)
@@ -1,7 +1,7 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, Boolean, Float, Integer, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, ForeignKey, Boolean, Float, Integer, DateTime, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -15,8 +15,28 @@ class Game(Base):
     finished = Column(Boolean)
     score = Column(Float)
     offset = Column(Integer)
+    question_count = Column(Integer)
+    results = Column(JSONB)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id"))
     game_questions = relationship("GameQuestion")
+
+
+Index(
+    "ix_games_quiz_id_score_finished_at",
+    Game.quiz_id,
+    Game.score.desc(),
+    Game.finished_at,
+    postgresql_where=Game.finished.is_(True),
+)
+Index(
+    "ix_games_quiz_id_updated_at",
+    Game.quiz_id,
+    Game.updated_at,
+    postgresql_where=Game.finished.is_(True),
+)
+Index("ix_games_user_id_created_at_id", Game.user_id, Game.created_at, Game.id)
+Index("ix_games_quiz_id_created_at_id", Game.quiz_id, Game.created_at, Game.id)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, ForeignKey, Boolean, Float, DateTime
+from sqlalchemy import Column, ForeignKey, Boolean, Float, DateTime, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -10,11 +10,16 @@ from services.db_service import Base
 
 class GameQuestion(Base):
     __tablename__ = "game_questions"
+    __table_args__ = (
+        Index("ix_game_questions_game_id_question_id", "game_id", "question_id"),
+        Index("ix_game_questions_game_id_position", "game_id", "position", unique=True),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     answered = Column(Boolean)
     skipped = Column(Boolean)
     answer_score = Column(Float)
+    position = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id"), index=True)
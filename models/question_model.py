@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -9,9 +9,11 @@ from services.db_service import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (Index("ix_questions_quiz_id_ordinal", "quiz_id", "ordinal"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String)
     type = Column(String)
+    ordinal = Column(Integer)
     quiz_id = Column(UUID(as_uuid=True), ForeignKey("quizzes.id"))
-    answers = relationship("Answer", lazy=False)
+    answers = relationship("Answer", lazy=False, cascade="all, delete-orphan")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+
+from services.db_service import Base
+
+
+class QuizArchive(Base):
+    __tablename__ = "quiz_archives"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    title = Column(String)
+    user_id = Column(UUID(as_uuid=True), index=True)
+    deleted_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+    game_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
@@ -1,8 +1,18 @@
 import uuid
 
-from sqlalchemy import Column, String, ForeignKey, Boolean, DateTime
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column,
+    String,
+    ForeignKey,
+    Boolean,
+    DateTime,
+    Index,
+    Integer,
+    Float,
+    Text,
+)
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, column_property, deferred
 from sqlalchemy.sql import func
 
 from services.db_service import Base
@@ -14,9 +24,46 @@ class Quiz(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String)
     published = Column(Boolean)
-    deleted = Column(Boolean, index=True, default=False)
+    deleted = Column(Boolean, default=False)
+    deleted_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    content_version = Column(Integer, nullable=False, default=1, server_default="1")
+    question_count = Column(Integer, nullable=False, default=0, server_default="0")
+    sample_size = Column(Integer)
+    games_started = Column(Integer, nullable=False, default=0, server_default="0")
+    games_finished = Column(Integer, nullable=False, default=0, server_default="0")
+    finished_score_sum = Column(Float, nullable=False, default=0, server_default="0")
+    average_score = column_property(finished_score_sum / func.nullif(games_finished, 0))
+    search_vector = deferred(Column(TSVECTOR))
+    search_text = deferred(Column(Text))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     questions = relationship("Question")
     games = relationship("Game")
+
+
+Index(
+    "ix_quizzes_user_id_created_at_id",
+    Quiz.user_id,
+    Quiz.created_at,
+    Quiz.id,
+    postgresql_where=Quiz.deleted.is_(False),
+)
+Index(
+    "ix_quizzes_deleted_at",
+    Quiz.deleted_at,
+    postgresql_where=Quiz.deleted.is_(True),
+)
+Index(
+    "ix_quizzes_search_vector",
+    Quiz.search_vector,
+    postgresql_using="gin",
+    postgresql_where=Quiz.published.is_(True) & Quiz.deleted.is_(False),
+)
+Index(
+    "ix_quizzes_search_text_trgm",
+    Quiz.search_text,
+    postgresql_using="gin",
+    postgresql_ops={"search_text": "gin_trgm_ops"},
+    postgresql_where=Quiz.published.is_(True) & Quiz.deleted.is_(False),
+)
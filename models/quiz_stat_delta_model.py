@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger, Column, Float, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from services.db_service import Base
+
+
+class QuizStatDelta(Base):
+    __tablename__ = "quiz_stat_deltas"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    quiz_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    games_started = Column(Integer, nullable=False, default=0, server_default="0")
+    games_finished = Column(Integer, nullable=False, default=0, server_default="0")
+    finished_score_sum = Column(Float, nullable=False, default=0, server_default="0")
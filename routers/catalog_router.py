@@ -0,0 +1,26 @@
+from fastapi import Depends, Query
+from sqlalchemy.orm import Session
+
+from controllers.catalog_controller import CatalogController
+from helpers.response_helper import ResponseSerializer
+from routers import APIRouter
+from schemas.catalog_schema import CatalogResponse
+from services.db_service import get_session
+
+router = APIRouter(prefix="/catalog", tags=["Catalog"])
+catalog_serializer = ResponseSerializer(CatalogResponse)
+
+
+@router.get("/quizzes", response_model=CatalogResponse)
+def search_quizzes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(15, ge=1, le=50),
+    cursor: str | None = Query(None, description="next_cursor of previous page"),
+    session: Session = Depends(get_session),
+):
+    """
+    Search published quizzes, misspelled words are matched too
+    """
+    return catalog_serializer.response(
+        CatalogController.search_quizzes(session, q, limit, cursor)
+    )
@@ -1,13 +1,26 @@
+import asyncio
+from typing import Callable
+
 from fastapi import Depends
+from fastapi.responses import JSONResponse
 from pydantic import UUID4
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from controllers.game_controller import GameController
+from helpers.cache_helper import (
+    ConditionalRequest,
+    REVALIDATE_CACHE_CONTROL,
+    conditional_request,
+    make_etag,
+    set_cache_headers,
+)
 from helpers.pagination_helper import pagination_parameters, PaginateSchema, Paginate
+from helpers.response_helper import ResponseSerializer
 from routers import APIRouter
 from schemas.auth_schema import UserDetails
-from schemas.game_answer_schema import GameAnswerSchema
-from schemas.game_question_schema import NextQuestionResponse
+from schemas.game_answer_schema import GameAnswerSchema, GameSubmissionSchema
+from schemas.game_question_schema import NextQuestionResponse, GameQuestionResponse
 from schemas.game_schema import (
     GameStartSchema,
     StartGameResponse,
@@ -15,84 +28,185 @@ from schemas.game_schema import (
     FinalResultsResponse,
 )
 from services.auth_service import get_current_active_user
-from services.db_service import get_session
+from services.db_service import get_db_session, run_in_session
+from services.idempotency_service import idempotency_key, IdempotentRequest
 
 router = APIRouter(prefix="/games", tags=["Games"])
+games_serializer = ResponseSerializer(Paginate[GameResponse])
+
+
+async def save_progress(session: Session | AsyncSession, function: Callable, *args):
+    """
+    Runs answer or skip and waits for write-behind journal on event loop,
+    so waiting requests hold neither worker thread nor DB connection
+    Args:
+        session: session from get_db_session dependency
+        function: controller method returning journal future or None
+        *args: rest of function arguments
+
+    """
+    progress = await run_in_session(session, function, *args)
+    if progress:
+        await asyncio.wrap_future(progress)
 
 
 @router.get("/", response_model=Paginate[GameResponse])
-def get_user_games(
+async def get_user_games(
     pagination: PaginateSchema = Depends(pagination_parameters),
     current_user: UserDetails = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: Session | AsyncSession = Depends(get_db_session),
 ):
-    return GameController.get_games(
-        session, current_user.id, pagination.limit, pagination.offset
+    return games_serializer.response(
+        await run_in_session(
+            session,
+            GameController.get_games,
+            current_user.id,
+            pagination,
+        )
     )
 
 
 @router.post("/start", response_model=StartGameResponse)
-def start_game(
+async def start_game(
     game_body: GameStartSchema,
     current_user: UserDetails = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: Session | AsyncSession = Depends(get_db_session),
+    idempotency: IdempotentRequest = Depends(idempotency_key),
 ):
     """
     Start a new game from quiz
     """
-    return GameController.start_game(session, game_body, current_user.id)
+    return await idempotency.run(
+        200,
+        run_in_session,
+        session,
+        GameController.start_game,
+        game_body,
+        current_user.id,
+    )
 
 
 @router.get("/{game_id}/questions/next", response_model=NextQuestionResponse)
-def next_question(
+async def next_question(
     game_id: UUID4,
     current_user: UserDetails = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: Session | AsyncSession = Depends(get_db_session),
 ):
     """
     Retrieves next question, returns same if question is not answered or skipped.
     """
-    return GameController().next_question(session, game_id, current_user.id)
+    return await run_in_session(
+        session, GameController().next_question, game_id, current_user.id
+    )
+
+
+@router.get("/{game_id}/questions", response_model=list[GameQuestionResponse])
+async def get_game_questions(
+    game_id: UUID4,
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session | AsyncSession = Depends(get_db_session),
+):
+    """
+    Retrieves all questions left to answer in the game
+    """
+    return await run_in_session(
+        session, GameController().get_game_questions, game_id, current_user.id
+    )
 
 
 @router.post("/{game_id}/questions/{question_id}/submit", status_code=204)
-def answer_question(
+async def answer_question(
     game_id: UUID4,
     question_id: UUID4,
     answer_data: GameAnswerSchema,
     current_user: UserDetails = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: Session | AsyncSession = Depends(get_db_session),
+    idempotency: IdempotentRequest = Depends(idempotency_key),
 ):
     """
     Answer a question
     """
-    return GameController().answer_question(
-        session, answer_data, game_id, question_id, current_user.id
+    return await idempotency.run(
+        204,
+        save_progress,
+        session,
+        GameController().answer_question,
+        answer_data,
+        game_id,
+        question_id,
+        current_user.id,
     )
 
 
 @router.post("/{game_id}/questions/{question_id}/skip", status_code=204)
-def skip_question(
+async def skip_question(
     game_id: UUID4,
     question_id: UUID4,
     current_user: UserDetails = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: Session | AsyncSession = Depends(get_db_session),
+    idempotency: IdempotentRequest = Depends(idempotency_key),
 ):
     """
     Skip question
     """
-    return GameController().skip_question(
-        session, game_id, question_id, current_user.id
+    return await idempotency.run(
+        204,
+        save_progress,
+        session,
+        GameController().skip_question,
+        game_id,
+        question_id,
+        current_user.id,
+    )
+
+
+@router.post("/{game_id}/submit", response_model=FinalResultsResponse)
+async def submit_game(
+    game_id: UUID4,
+    submission_data: GameSubmissionSchema,
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session | AsyncSession = Depends(get_db_session),
+    idempotency: IdempotentRequest = Depends(idempotency_key),
+):
+    """
+    Answer or skip all questions left in the game at once and finish it
+    """
+    return await idempotency.run(
+        200,
+        run_in_session,
+        session,
+        GameController().submit_game,
+        submission_data,
+        game_id,
+        current_user.id,
     )
 
 
 @router.get("/{game_id}/results", response_model=FinalResultsResponse)
-def get_results(
+async def get_results(
     game_id: UUID4,
+    conditional: ConditionalRequest = Depends(conditional_request),
     current_user: UserDetails = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: Session | AsyncSession = Depends(get_db_session),
 ):
     """
-    Get final results
+    Get final results, responds with 304 when If-None-Match has current ETag.
+    Results change when quiz is rescored, so clients revalidate them
     """
-    return GameController().get_results(session, game_id, current_user.id)
+    version = await run_in_session(
+        session, GameController.get_results_version, game_id, current_user.id
+    )
+    etag = None
+    if version and version.finished:
+        etag = make_etag("results", game_id, version.updated_at)
+        not_modified = conditional.not_modified(etag, REVALIDATE_CACHE_CONTROL)
+        if not_modified:
+            return not_modified
+    response = JSONResponse(
+        await run_in_session(
+            session, GameController().get_results, game_id, current_user.id
+        )
+    )
+    if etag:
+        set_cache_headers(response, etag, REVALIDATE_CACHE_CONTROL)
+    return response
@@ -3,7 +3,17 @@ from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from controllers.question_controller import QuestionController
-from helpers.pagination_helper import Paginate
+from controllers.quiz_controller import QuizController
+from helpers.cache_helper import (
+    ConditionalRequest,
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    conditional_request,
+    make_etag,
+    set_cache_headers,
+)
+from helpers.pagination_helper import pagination_parameters, PaginateSchema, Paginate
+from helpers.response_helper import ResponseSerializer
 from routers import APIRouter
 from schemas.auth_schema import UserDetails
 from schemas.question_schema import (
@@ -15,18 +25,42 @@ from services.auth_service import get_current_active_user
 from services.db_service import get_session
 
 router = APIRouter(prefix="/quizzes/{quiz_id}/questions", tags=["Questions"])
+questions_serializer = ResponseSerializer(Paginate[QuestionResponse])
 
 
 @router.get("/", response_model=Paginate[QuestionResponse])
 def get_questions(
     quiz_id: UUID4,
+    pagination: PaginateSchema = Depends(pagination_parameters),
+    conditional: ConditionalRequest = Depends(conditional_request),
     current_user: UserDetails = Depends(get_current_active_user),
     session: Session = Depends(get_session),
 ):
     """
-    Get questions from quiz
+    Get page of quiz questions in their order, responds with 304 when If-None-Match
+    has current ETag.
+    Questions of published quiz can't change and are cached longer
     """
-    return QuestionController.get_questions(session, quiz_id, current_user.id)
+    version = QuizController.get_quiz_version(session, quiz_id, current_user.id)
+    etag = make_etag(
+        "questions",
+        quiz_id,
+        version.content_version,
+        pagination.limit,
+        pagination.offset,
+        pagination.cursor,
+    )
+    cache_control = (
+        IMMUTABLE_CACHE_CONTROL if version.published else REVALIDATE_CACHE_CONTROL
+    )
+    not_modified = conditional.not_modified(etag, cache_control)
+    if not_modified:
+        return not_modified
+    response = questions_serializer.response(
+        QuestionController.get_questions(session, quiz_id, current_user.id, pagination)
+    )
+    set_cache_headers(response, etag, cache_control)
+    return response
 
 
 @router.post("/", status_code=204)
@@ -1,12 +1,28 @@
-from fastapi import Depends
+import codecs
+
+from fastapi import Depends, File, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from controllers.export_controller import ExportController
+from controllers.import_controller import ImportController
 from controllers.quiz_controller import QuizController
+from helpers.cache_helper import (
+    ConditionalRequest,
+    REVALIDATE_CACHE_CONTROL,
+    conditional_request,
+    make_etag,
+    set_cache_headers,
+)
 from helpers.pagination_helper import PaginateSchema, pagination_parameters, Paginate
+from helpers.response_helper import ResponseSerializer
 from routers import APIRouter
 from schemas.auth_schema import UserDetails
+from schemas.export_schema import ExportFormatEnum
 from schemas.game_schema import QuizGamesResponse, GameDetailResponse
+from schemas.import_schema import ImportFormatEnum, ImportResponse
+from schemas.leaderboard_schema import LeaderboardResponse, LeaderboardEntryResponse
 from schemas.quiz_schema import (
     QuizSchema,
     QuizCreateResponse,
@@ -17,6 +33,9 @@ from services.auth_service import get_current_active_user
 from services.db_service import get_session
 
 router = APIRouter(prefix="/quizzes", tags=["Quizzes"])
+quiz_serializer = ResponseSerializer(QuizResponse)
+quizzes_serializer = ResponseSerializer(Paginate[QuizResponse])
+quiz_games_serializer = ResponseSerializer(Paginate[QuizGamesResponse])
 
 
 @router.post("/", response_model=QuizCreateResponse)
@@ -31,6 +50,33 @@ def create_quiz(
     return QuizController.create_quiz(session, quiz_data, current_user.id)
 
 
+@router.post("/import", response_model=ImportResponse)
+def import_quizzes(
+    file: UploadFile = File(..., description="JSON lines or csv file"),
+    file_format: ImportFormatEnum
+    | None = Query(None, alias="format", description="detected from file name"),
+    publish: bool = Query(False),
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Import quizzes in bulk, invalid rows are skipped and reported
+    """
+    if not file_format:
+        file_format = (
+            ImportFormatEnum.CSV
+            if (file.filename or "").lower().endswith(".csv")
+            else ImportFormatEnum.JSONL
+        )
+    return ImportController().import_quizzes(
+        session,
+        codecs.iterdecode(file.file, "utf-8"),
+        file_format,
+        current_user.id,
+        publish,
+    )
+
+
 @router.get("/", response_model=Paginate[QuizResponse])
 def get_user_quizzes(
     pagination: PaginateSchema = Depends(pagination_parameters),
@@ -40,21 +86,39 @@ def get_user_quizzes(
     """
     Create empty quiz
     """
-    return QuizController.get_quizzes(
-        session, current_user.id, pagination.limit, pagination.offset
+    return quizzes_serializer.response(
+        QuizController.get_quizzes(session, current_user.id, pagination)
     )
 
 
 @router.get("/{quiz_id}", response_model=QuizResponse)
 def get_quiz_details(
     quiz_id: UUID4,
+    conditional: ConditionalRequest = Depends(conditional_request),
     current_user: UserDetails = Depends(get_current_active_user),
     session: Session = Depends(get_session),
 ):
     """
-    Retrieve Quiz Details
+    Retrieve Quiz Details, responds with 304 when If-None-Match has current ETag
     """
-    return QuizController().get_quiz_details(session, quiz_id, current_user.id).__dict__
+    version = QuizController.get_quiz_version(session, quiz_id, current_user.id)
+    etag = make_etag(
+        "quiz",
+        quiz_id,
+        version.content_version,
+        version.games_started,
+        version.games_finished,
+        version.finished_score_sum,
+    )
+    # counters change while quiz is played, so even published quiz is revalidated
+    not_modified = conditional.not_modified(etag, REVALIDATE_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
+    response = quiz_serializer.response(
+        QuizController().get_quiz_details(session, quiz_id, current_user.id)
+    )
+    set_cache_headers(response, etag, REVALIDATE_CACHE_CONTROL)
+    return response
 
 
 @router.patch("/{quiz_id}/publish", status_code=204)
@@ -104,8 +168,61 @@ def get_quiz_games(
     """
     Get lis of quiz games
     """
-    return QuizController().get_quiz_games(
-        session, quiz_id, current_user.id, pagination.limit, pagination.offset
+    return quiz_games_serializer.response(
+        QuizController().get_quiz_games(session, quiz_id, current_user.id, pagination)
+    )
+
+
+@router.get("/{quiz_id}/export", response_class=StreamingResponse)
+def export_quiz_games(
+    quiz_id: UUID4,
+    export_format: ExportFormatEnum = Query(ExportFormatEnum.NDJSON, alias="format"),
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Export all quiz games with answers, response is streamed while it is read from db
+    """
+    content = ExportController().export_quiz_games(
+        session, quiz_id, current_user.id, export_format
+    )
+    if export_format == ExportFormatEnum.CSV:
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="quiz-{quiz_id}-games.{extension}"'
+        },
+    )
+
+
+@router.get("/{quiz_id}/leaderboard", response_model=LeaderboardResponse)
+def get_quiz_leaderboard(
+    quiz_id: UUID4,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Get best games of published quiz
+    """
+    return QuizController().get_leaderboard(session, quiz_id, limit)
+
+
+@router.get("/{quiz_id}/leaderboard/me", response_model=LeaderboardEntryResponse)
+def get_quiz_leaderboard_rank(
+    quiz_id: UUID4,
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Get rank of your game in published quiz
+    """
+    return QuizController().get_leaderboard_rank(
+        session, quiz_id, current_user.id, current_user.username
     )
 
 
@@ -0,0 +1,153 @@
+import logging
+
+from fastapi import (
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+from pydantic import UUID4
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from controllers.room_controller import RoomController
+from routers import APIRouter
+from schemas.auth_schema import UserDetails
+from schemas.room_schema import RoomCreateSchema, RoomCreateResponse, RoomMessageSchema
+from services.auth_service import decode_token, get_current_active_user
+from services.db_service import get_session, run_in_new_session
+from services.room_service import room_service, Room
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/rooms", tags=["Rooms"])
+
+
+@router.post("/", response_model=RoomCreateResponse)
+def create_room(
+    room_data: RoomCreateSchema,
+    current_user: UserDetails = Depends(get_current_active_user),
+    session: Session = Depends(get_session),
+):
+    """
+    Create live room for published quiz, room is driven by its creator over websocket
+    """
+    return RoomController.create_room(session, room_data.quiz_id, current_user.id)
+
+
+async def send_error(websocket: WebSocket, detail: str) -> None:
+    await websocket.send_text(room_service.encode({"event": "error", "detail": detail}))
+
+
+async def close_question(room: Room) -> None:
+    question_payload = room.question_payload
+    answers = room_service.close_question(room)
+    try:
+        await run_in_new_session(RoomController.save_question_answers, room, answers)
+    except SQLAlchemyError:
+        logger.exception(f"Answers of room {room.id} could not be saved")
+        room_service.reopen_question(room, answers, question_payload)
+        raise HTTPException(
+            status_code=503, detail="Answers could not be saved, question is reopened"
+        )
+    await room_service.broadcast(
+        room,
+        {
+            "event": "standings",
+            "index": room.question_index,
+            "standings": room_service.standings(room),
+        },
+    )
+
+
+async def handle_host_message(room: Room, message: RoomMessageSchema) -> None:
+    async with room.lock:
+        room.touch()
+        if room.finished:
+            raise HTTPException(status_code=400, detail="Room is already finished")
+        if message.action == "close":
+            if not room.question_open:
+                raise HTTPException(status_code=400, detail="Question is closed")
+            await close_question(room)
+        elif message.action == "next":
+            if room.question_open:
+                await close_question(room)
+            if room.has_next_question:
+                room.question_payload = room_service.encode(
+                    room_service.open_question(room)
+                )
+                await room_service.broadcast_payload(room, room.question_payload)
+            else:
+                room.finished = True
+                room_service.remove_room(room)
+                await room_service.broadcast(
+                    room,
+                    {"event": "finished", "standings": room_service.standings(room)},
+                )
+                await room_service.close(room)
+        else:
+            raise HTTPException(status_code=400, detail="Host can't answer questions")
+
+
+@router.websocket("/{room_id}/ws")
+async def room_websocket(
+    websocket: WebSocket, room_id: UUID4, token: str | None = Query(None)
+):
+    """
+    Room connection, token is passed as query parameter.
+    Host sends `next` and `close` actions, players send `answer` action with choices
+    """
+    await websocket.accept()
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Token Not Provided")
+        user = decode_token(token)
+        if user.disabled:
+            raise HTTPException(status_code=403, detail="Inactive user")
+        room = room_service.get_room(room_id)
+        is_host = user.id == room.host_id
+        if is_host:
+            room_service.connect_host(room, websocket)
+        else:
+            # questions can't be opened or closed while player is joining
+            async with room.lock:
+                player = await run_in_new_session(RoomController.join_room, room, user)
+                room_service.connect(room, player, websocket)
+    except HTTPException as exc:
+        await send_error(websocket, exc.detail)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.send_text(
+        room_service.encode({"event": "joined", "room_id": room.id, "host": is_host})
+    )
+    if room.question_payload:
+        await websocket.send_text(room.question_payload)
+    try:
+        while not room.finished:
+            try:
+                message = RoomMessageSchema.parse_obj(await websocket.receive_json())
+                if is_host:
+                    await handle_host_message(room, message)
+                elif message.action == "answer":
+                    RoomController.answer_question(room, user.id, message.choices)
+                    room.touch()
+                    await websocket.send_text(
+                        room_service.encode(
+                            {"event": "answer_received", "index": room.question_index}
+                        )
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=403, detail="Only host can control room"
+                    )
+            except ValueError as exc:
+                await send_error(websocket, str(exc))
+            except HTTPException as exc:
+                await send_error(websocket, exc.detail)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        room_service.disconnect(room, websocket)
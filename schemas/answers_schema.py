@@ -12,6 +12,10 @@ class AnswerSchema(BaseModel):
         min_anystr_length = 1
 
 
+class UpdateAnswerSchema(AnswerSchema):
+    id: UUID4 | None = None
+
+
 class AnswerResponse(BaseModel):
     id: UUID4
     value: str
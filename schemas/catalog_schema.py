@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from pydantic import BaseModel, UUID4, validator
+
+
+class CatalogQuizResponse(BaseModel):
+    id: UUID4
+    title: str
+    created_at: datetime
+    question_count: int
+    games_started: int
+    games_finished: int
+    average_score: float | None
+
+    @validator("average_score")
+    def round_float(cls, average_score):
+        if average_score is None:
+            return None
+        return float("{:.3f}".format(average_score))
+
+
+class CatalogResponse(BaseModel):
+    items: list[CatalogQuizResponse]
+    next_cursor: str | None
@@ -3,3 +3,13 @@ from pydantic import BaseModel, UUID4
 
 class GameAnswerSchema(BaseModel):
     choices: list[UUID4]
+
+
+class GameQuestionSubmissionSchema(BaseModel):
+    question_id: UUID4
+    choices: list[UUID4] = []
+    skipped: bool = False
+
+
+class GameSubmissionSchema(BaseModel):
+    answers: list[GameQuestionSubmissionSchema]
@@ -13,3 +13,10 @@ class NextQuestionResponse(BaseModel):
     type: QuestionTypeEnum
     title: str
     answers: list[NextQuestionAnswersResponse]
+
+
+class GameQuestionResponse(BaseModel):
+    question_id: UUID4
+    type: QuestionTypeEnum
+    title: str
+    answers: list[NextQuestionAnswersResponse]
@@ -0,0 +1,47 @@
+from enum import Enum
+
+from pydantic import BaseModel, conint, conlist, validator
+
+from schemas.question_schema import (
+    MAX_QUESTIONS_PER_BANK,
+    MAX_QUESTIONS_PER_GAME,
+    QuestionSchema,
+)
+
+
+class ImportFormatEnum(str, Enum):
+    JSONL = "jsonl"
+    CSV = "csv"
+
+
+class ImportQuizSchema(BaseModel):
+    title: str
+    questions: conlist(QuestionSchema, min_items=1, max_items=MAX_QUESTIONS_PER_BANK)
+    sample_size: conint(ge=1, le=MAX_QUESTIONS_PER_GAME) | None = None
+
+    class Config:
+        """Extra configuration options"""
+
+        anystr_strip_whitespace = True
+        min_anystr_length = 1
+
+    @validator("sample_size", always=True)
+    def check_question_count(cls, sample_size, values):
+        questions = values.get("questions") or []
+        if sample_size is None and len(questions) > MAX_QUESTIONS_PER_GAME:
+            raise ValueError(
+                f"Quiz without sample_size can have at most {MAX_QUESTIONS_PER_GAME} questions"
+            )
+        return sample_size
+
+
+class ImportErrorResponse(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportResponse(BaseModel):
+    imported_quizzes: int
+    imported_questions: int
+    error_count: int
+    errors: list[ImportErrorResponse]
@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from pydantic import BaseModel, UUID4, validator
+
+
+class LeaderboardEntryResponse(BaseModel):
+    rank: int
+    game_id: UUID4
+    user_id: UUID4
+    username: str
+    score: float
+    finished_at: datetime
+
+    @validator("score")
+    def round_float(cls, score):
+        return float("{:.3f}".format(score))
+
+
+class LeaderboardResponse(BaseModel):
+    items: list[LeaderboardEntryResponse]
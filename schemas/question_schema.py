@@ -2,7 +2,14 @@ from enum import Enum
 
 from pydantic import BaseModel, conlist, UUID4
 
-from schemas.answers_schema import AnswerSchema, AnswerResponse
+from schemas.answers_schema import AnswerSchema, AnswerResponse, UpdateAnswerSchema
+
+
+# quiz without sample size asks all its questions in every game,
+# question bank asks sample of at most MAX_QUESTIONS_PER_GAME questions
+MAX_QUESTIONS_PER_GAME = 10
+MAX_QUESTIONS_PER_BANK = 20000
+MAX_QUESTIONS_PER_REQUEST = 1000
 
 
 class QuestionTypeEnum(Enum):
@@ -23,7 +30,7 @@ class QuestionSchema(BaseModel):
 
 
 class QuestionsSchema(BaseModel):
-    questions: conlist(QuestionSchema, min_items=1, max_items=10)
+    questions: conlist(QuestionSchema, min_items=1, max_items=MAX_QUESTIONS_PER_REQUEST)
 
 
 class QuestionResponse(BaseModel):
@@ -36,7 +43,7 @@ class QuestionResponse(BaseModel):
 class UpdateQuestionSchema(BaseModel):
     title: str | None = None
     type: QuestionTypeEnum | None = None
-    answers: conlist(AnswerSchema, min_items=2, max_items=5) | None = None
+    answers: conlist(UpdateAnswerSchema, min_items=2, max_items=5) | None = None
 
     class Config:
         """Extra configuration options"""
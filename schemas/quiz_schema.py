@@ -1,9 +1,12 @@
-from pydantic import BaseModel, UUID4
+from pydantic import BaseModel, UUID4, conint, validator
 from datetime import datetime
 
+from schemas.question_schema import MAX_QUESTIONS_PER_GAME
+
 
 class QuizSchema(BaseModel):
     title: str
+    sample_size: conint(ge=1, le=MAX_QUESTIONS_PER_GAME) | None = None
 
     class Config:
         """Extra configuration options"""
@@ -21,10 +24,22 @@ class QuizResponse(BaseModel):
     title: str
     published: bool
     created_at: datetime
+    question_count: int
+    sample_size: int | None
+    games_started: int
+    games_finished: int
+    average_score: float | None
+
+    @validator("average_score")
+    def round_float(cls, average_score):
+        if average_score is None:
+            return None
+        return float("{:.3f}".format(average_score))
 
 
 class UpdateQuizSchema(BaseModel):
-    title: str
+    title: str | None = None
+    sample_size: conint(ge=1, le=MAX_QUESTIONS_PER_GAME) | None = None
 
     class Config:
         """Extra configuration options"""
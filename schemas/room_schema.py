@@ -0,0 +1,16 @@
+from typing import Literal
+
+from pydantic import BaseModel, UUID4
+
+
+class RoomCreateSchema(BaseModel):
+    quiz_id: UUID4
+
+
+class RoomCreateResponse(BaseModel):
+    id: UUID4
+
+
+class RoomMessageSchema(BaseModel):
+    action: Literal["next", "close", "answer"]
+    choices: list[UUID4] = []
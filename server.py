@@ -1,12 +1,14 @@
 from fastapi import FastAPI
 
-from helpers.app_helper import shutdown_event
+from helpers.app_helper import shutdown_event, startup_event
 from routers import (
     health_router,
     auth_router,
     quiz_router,
     question_router,
     game_router,
+    room_router,
+    catalog_router,
 )
 
 
@@ -17,6 +19,8 @@ def init_routers(app_):
         quiz_router,
         question_router,
         game_router,
+        room_router,
+        catalog_router,
     ):
         app_.include_router(router.router, prefix="/api/v1")
 
@@ -26,6 +30,7 @@ def create_app():
         title="QuizAPI",
         description="Quiz API",
         version="1.0.0",
+        on_startup=[startup_event],
         on_shutdown=[shutdown_event],
     )
     init_routers(app_)
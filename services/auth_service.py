@@ -1,3 +1,8 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
 from fastapi import Depends
 from fastapi.exceptions import HTTPException
 from fastapi.requests import Request
@@ -13,6 +18,90 @@ SECRET_KEY = app_config["SECRET_KEY"]
 authorization_header_scheme = HTTPBearer(auto_error=False)
 
 
+class TokenCache:
+    """
+    Keeps user details of verified tokens until their expiration,
+    so token signature is checked once per worker instead of on every request.
+    Tokens are stored by their digest, least recently used ones are evicted first
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.tokens = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> UserDetails | None:
+        """
+        Retrieves user details of verified token which hasn't expired yet
+        Args:
+            token: jwt access token
+
+        Returns:
+            user details or None when token must be decoded
+        """
+        key = self.digest(token)
+        with self.lock:
+            cached = self.tokens.get(key)
+            if cached and cached[1] > time.time():
+                self.tokens.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            if cached:
+                del self.tokens[key]
+            self.misses += 1
+        return None
+
+    def set(self, token: str, user_details: UserDetails, expires_at) -> None:
+        """
+        Stores user details of verified token
+        Args:
+            token: jwt access token
+            user_details: details of user token was issued for
+            expires_at: `exp` claim of the token, tokens without it aren't stored
+
+        """
+        if not self.max_size or not isinstance(expires_at, (int, float)):
+            return
+        key = self.digest(token)
+        with self.lock:
+            self.tokens[key] = (user_details, expires_at)
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > self.max_size:
+                self.tokens.popitem(last=False)
+
+
+token_cache = TokenCache(int(app_config.get("AUTH_TOKEN_CACHE_SIZE", 10000)))
+
+
+def decode_token(token: str) -> UserDetails:
+    """
+    Decodes auth token, tokens verified before are taken from token cache
+    Args:
+        token: jwt access token
+
+    Returns:
+        details of user token was issued for
+    """
+    user_details = token_cache.get(token)
+    if user_details:
+        return user_details
+    try:
+        decoded_token = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except ExpiredSignatureError:
+        raise HTTPException(status_code=400, detail="Access Token Has Expired")
+    except JWTError:
+        raise HTTPException(status_code=500, detail="Invalid Token")
+    user_details = UserDetails(**decoded_token)
+    token_cache.set(token, user_details, decoded_token.get("exp"))
+    return user_details
+
+
 async def get_current_user(
     request: Request,
     token: HTTPAuthorizationCredentials = Depends(authorization_header_scheme),
@@ -28,16 +117,7 @@ async def get_current_user(
     """
     if not token:
         raise HTTPException(status_code=401, detail="Authorization Header Not Provided")
-    try:
-        decoded_token = jwt.decode(
-            token.credentials, SECRET_KEY, algorithms=[ALGORITHM]
-        )
-    except ExpiredSignatureError:
-        raise HTTPException(status_code=400, detail="Access Token Has Expired")
-    except JWTError:
-        raise HTTPException(status_code=500, detail="Invalid Token")
-
-    user_details = UserDetails(**decoded_token)
+    user_details = decode_token(token.credentials)
     request.state.user_details = user_details
     return user_details
 
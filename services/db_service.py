@@ -1,5 +1,10 @@
+from typing import Callable
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from settings import app_config
 
@@ -8,6 +13,8 @@ Base = declarative_base()
 
 class DBService:
     engine = None
+    async_engine = None
+    async_mode = app_config.get("DB_ASYNC_MODE", "false").lower() == "true"
 
     def create_engine(self):
         """
@@ -18,15 +25,34 @@ class DBService:
         self.engine = create_engine(app_config.get("DB_URI"))
         return self.engine
 
+    def create_async_engine(self):
+        """
+        Creates sqlalchemy async db engine using asyncpg driver
+        Returns:
+            created engine
+        """
+        url = make_url(app_config.get("DB_URI")).set(drivername="postgresql+asyncpg")
+        self.async_engine = create_async_engine(url)
+        return self.async_engine
+
     def dispose_engine(self):
         """
         Disposes engine
         """
         self.engine.dispose()
 
+    async def dispose_async_engine(self):
+        """
+        Disposes async engine
+        """
+        if self.async_engine:
+            await self.async_engine.dispose()
+
 
 db_service = DBService()
 db_service.create_engine()
+if db_service.async_mode:
+    db_service.create_async_engine()
 
 
 # Dependency
@@ -36,3 +62,60 @@ def get_session():
         yield session
     finally:
         session.close()
+
+
+# Dependency
+async def get_async_session():
+    async with AsyncSession(db_service.async_engine, autoflush=False) as session:
+        yield session
+
+
+# Dependency, session type is selected by DB_ASYNC_MODE
+get_db_session = get_async_session if db_service.async_mode else get_session
+
+
+async def run_in_session(session, function: Callable, *args):
+    """
+    Runs controller method with sync session api without blocking event loop.
+    Async session runs it on asyncpg connection, sync session runs it in threadpool
+    Args:
+        session: session from get_db_session dependency
+        function: function receiving sync session as first argument
+        *args: rest of function arguments
+
+    Returns:
+        function result
+    """
+    if isinstance(session, AsyncSession):
+        return await session.run_sync(function, *args)
+    return await run_in_threadpool(function, session, *args)
+
+
+def run_with_new_session(function: Callable, *args):
+    """
+    Runs function with its own short-lived sync session
+    Args:
+        function: function receiving session as first argument
+        *args: rest of function arguments
+
+    Returns:
+        function result
+    """
+    with sessionmaker(
+        autocommit=False, autoflush=False, bind=db_service.engine
+    )() as session:
+        return function(session, *args)
+
+
+async def run_in_new_session(function: Callable, *args):
+    """
+    Runs function with its own sync session in threadpool, used by long-lived
+    connections which can't keep request session open
+    Args:
+        function: function receiving session as first argument
+        *args: rest of function arguments
+
+    Returns:
+        function result
+    """
+    return await run_in_threadpool(run_with_new_session, function, *args)
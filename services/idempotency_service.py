@@ -0,0 +1,327 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from fastapi import Depends, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.requests import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import UUID4
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from models.idempotency_key_model import IdempotencyKey
+from schemas.auth_schema import UserDetails
+from services.auth_service import get_current_active_user
+from services.db_service import db_service
+from settings import app_config
+
+# request holding the key is considered crashed after this time and key can be reused
+RESERVATION_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    request_hash: str
+    status_code: int | None = None
+    response_body: dict | list | None = None
+
+    @property
+    def completed(self) -> bool:
+        return self.status_code is not None
+
+
+class MemoryIdempotencyStore:
+    """
+    Keeps responses in memory of current worker
+    """
+
+    blocking = False
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.records = OrderedDict()
+        self.lock = threading.Lock()
+
+    def evict(self, now: float) -> None:
+        while self.records:
+            _, expires_at = next(iter(self.records.values()))
+            if expires_at > now:
+                return
+            self.records.popitem(last=False)
+
+    def reserve(
+        self, user_id: UUID4, key: str, request_hash: str
+    ) -> IdempotencyRecord | None:
+        now = time.monotonic()
+        with self.lock:
+            self.evict(now)
+            stored = self.records.get((user_id, key))
+            if stored and stored[1] > now:
+                return stored[0]
+            self.records[(user_id, key)] = (
+                IdempotencyRecord(request_hash),
+                now + RESERVATION_SECONDS,
+            )
+            self.records.move_to_end((user_id, key))
+            while len(self.records) > self.max_size:
+                self.records.popitem(last=False)
+        return None
+
+    def complete(
+        self,
+        user_id: UUID4,
+        key: str,
+        record: IdempotencyRecord,
+        ttl_seconds: float,
+    ) -> None:
+        with self.lock:
+            self.records[(user_id, key)] = (record, time.monotonic() + ttl_seconds)
+            self.records.move_to_end((user_id, key))
+
+    def release(self, user_id: UUID4, key: str) -> None:
+        with self.lock:
+            self.records.pop((user_id, key), None)
+
+
+class PostgresIdempotencyStore:
+    """
+    Keeps responses in idempotency_keys table, shared by all workers
+    """
+
+    blocking = True
+
+    @staticmethod
+    def reserve(
+        user_id: UUID4, key: str, request_hash: str
+    ) -> IdempotencyRecord | None:
+        table = IdempotencyKey.__table__
+        statement = insert(table).values(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            expires_at=func.now() + timedelta(seconds=RESERVATION_SECONDS),
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.key],
+            set_={
+                "request_hash": statement.excluded.request_hash,
+                "status_code": None,
+                "response_body": None,
+                "expires_at": statement.excluded.expires_at,
+            },
+            where=table.c.expires_at <= func.now(),
+        ).returning(table.c.key)
+        with sessionmaker(bind=db_service.engine)() as session:
+            reserved = session.execute(statement).first()
+            if reserved:
+                session.commit()
+                return None
+            stored = (
+                session.query(
+                    IdempotencyKey.request_hash,
+                    IdempotencyKey.status_code,
+                    IdempotencyKey.response_body,
+                )
+                .filter(IdempotencyKey.user_id == user_id)
+                .filter(IdempotencyKey.key == key)
+                .first()
+            )
+        if not stored:
+            # key was released by failed request in the meantime
+            return IdempotencyRecord(request_hash)
+        return IdempotencyRecord(
+            request_hash=stored.request_hash,
+            status_code=stored.status_code,
+            response_body=stored.response_body,
+        )
+
+    @staticmethod
+    def complete(
+        user_id: UUID4, key: str, record: IdempotencyRecord, ttl_seconds: float
+    ) -> None:
+        with sessionmaker(bind=db_service.engine)() as session:
+            session.query(IdempotencyKey).filter(
+                IdempotencyKey.user_id == user_id
+            ).filter(IdempotencyKey.key == key).update(
+                {
+                    "status_code": record.status_code,
+                    "response_body": record.response_body,
+                    "expires_at": func.now() + timedelta(seconds=ttl_seconds),
+                },
+                synchronize_session=False,
+            )
+            session.commit()
+
+    @staticmethod
+    def release(user_id: UUID4, key: str) -> None:
+        with sessionmaker(bind=db_service.engine)() as session:
+            session.query(IdempotencyKey).filter(
+                IdempotencyKey.user_id == user_id
+            ).filter(IdempotencyKey.key == key).delete(synchronize_session=False)
+            session.commit()
+
+    @staticmethod
+    def purge_expired() -> int:
+        """
+        Deletes expired keys
+        Returns:
+            int: number of deleted keys
+        """
+        with sessionmaker(bind=db_service.engine)() as session:
+            deleted = session.execute(
+                delete(IdempotencyKey.__table__).where(
+                    IdempotencyKey.expires_at <= func.now()
+                )
+            ).rowcount
+            session.commit()
+        return deleted
+
+
+class IdempotentRequest:
+    def __init__(self, store, ttl_seconds: float, user_id: UUID4, key, request_hash):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.user_id = user_id
+        self.key = key
+        self.request_hash = request_hash
+
+    async def call_store(self, function: Callable, *args):
+        if self.store.blocking:
+            return await run_in_threadpool(function, *args)
+        return function(*args)
+
+    @staticmethod
+    def replay(record: IdempotencyRecord) -> Response:
+        headers = {"Idempotent-Replayed": "true"}
+        if record.response_body is None:
+            return Response(status_code=record.status_code, headers=headers)
+        return JSONResponse(
+            record.response_body, status_code=record.status_code, headers=headers
+        )
+
+    async def run(self, status_code: int, function: Callable, *args):
+        """
+        Runs route function once per idempotency key. Repeated requests get stored
+        response without running function, concurrent ones get conflict error.
+        Successful and client error responses are stored, server errors release the key
+        Args:
+            status_code: status code of successful response
+            function: async function handling request
+            *args: function arguments
+
+        Returns:
+            function result or stored response
+        """
+        if not self.key:
+            return await function(*args)
+        record = await self.call_store(
+            self.store.reserve, self.user_id, self.key, self.request_hash
+        )
+        if record:
+            if record.request_hash != self.request_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key is already used for another request",
+                )
+            if not record.completed:
+                raise HTTPException(
+                    status_code=409,
+                    detail="Request with this Idempotency-Key is in progress",
+                )
+            return self.replay(record)
+
+        try:
+            result = await function(*args)
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                await self.call_store(self.store.release, self.user_id, self.key)
+                raise
+            await self.call_store(
+                self.store.complete,
+                self.user_id,
+                self.key,
+                IdempotencyRecord(
+                    self.request_hash, exc.status_code, {"detail": exc.detail}
+                ),
+                self.ttl_seconds,
+            )
+            raise
+        except BaseException:
+            await self.call_store(self.store.release, self.user_id, self.key)
+            raise
+        await self.call_store(
+            self.store.complete,
+            self.user_id,
+            self.key,
+            IdempotencyRecord(self.request_hash, status_code, jsonable_encoder(result)),
+            self.ttl_seconds,
+        )
+        return result
+
+
+class IdempotencyService:
+    def __init__(self, backend: str, ttl_seconds: float, max_size: int):
+        if backend == "postgres":
+            self.store = PostgresIdempotencyStore()
+        else:
+            self.store = MemoryIdempotencyStore(max_size)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def hash_request(request: Request, body: bytes) -> str:
+        """
+        Hashes request, same key can't be reused for different request
+        Args:
+            request: Fast API Request object
+            body: request body
+
+        Returns:
+            str: sha256 hex digest
+        """
+        request_hash = hashlib.sha256()
+        request_hash.update(request.method.encode())
+        request_hash.update(request.url.path.encode())
+        request_hash.update(body)
+        return request_hash.hexdigest()
+
+    def create_request(
+        self, user: UserDetails, key: str | None, request_hash: str
+    ) -> IdempotentRequest:
+        return IdempotentRequest(
+            self.store, self.ttl_seconds, user.id, key, request_hash
+        )
+
+
+idempotency_service = IdempotencyService(
+    app_config.get("IDEMPOTENCY_BACKEND", "memory").lower(),
+    float(app_config.get("IDEMPOTENCY_TTL_SECONDS", 86400)),
+    int(app_config.get("IDEMPOTENCY_CACHE_SIZE", 100000)),
+)
+
+
+async def idempotency_key(
+    request: Request,
+    key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: UserDetails = Depends(get_current_active_user),
+) -> IdempotentRequest:
+    """
+    Reads optional Idempotency-Key header, keys are scoped by user
+    Args:
+        request: Fast API Request object
+        key: Idempotency-Key header
+        current_user: authenticated user
+
+    Returns:
+        IdempotentRequest used to run route function
+    """
+    request_hash = None
+    if key:
+        request_hash = idempotency_service.hash_request(request, await request.body())
+    return idempotency_service.create_request(current_user, key, request_hash)
@@ -0,0 +1,271 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from pydantic import UUID4
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models.game_model import Game
+from settings import app_config
+
+# games updated in transactions committed late can have earlier updated_at
+REFRESH_OVERLAP = timedelta(seconds=10)
+
+
+@dataclass(frozen=True)
+class LeaderboardEntry:
+    game_id: UUID4
+    user_id: UUID4
+    score: float
+    finished_at: datetime
+    updated_at: datetime | None = None
+
+    @property
+    def key(self) -> tuple:
+        return -self.score, self.finished_at, self.game_id
+
+
+@dataclass
+class Leaderboard:
+    loaded_at: float
+    refreshed_at: float
+    watermark: datetime | None = None
+    keys: list = field(default_factory=list)
+    entries: dict = field(default_factory=dict)
+    user_entries: dict = field(default_factory=dict)
+
+    def add(self, entry: LeaderboardEntry) -> None:
+        """
+        Adds game or replaces its entry if game was rescored
+        """
+        if entry.updated_at and (
+            not self.watermark or entry.updated_at > self.watermark
+        ):
+            self.watermark = entry.updated_at
+        previous_entry = self.entries.get(entry.game_id)
+        if previous_entry:
+            if previous_entry.key == entry.key:
+                return
+            del self.keys[bisect.bisect_left(self.keys, previous_entry.key)]
+        bisect.insort(self.keys, entry.key)
+        self.entries[entry.game_id] = entry
+        self.user_entries[entry.user_id] = entry
+
+    def rank(self, entry: LeaderboardEntry) -> int:
+        """
+        Games with equal score share same rank
+        """
+        return bisect.bisect_left(self.keys, (-entry.score,)) + 1
+
+
+class LeaderboardService:
+    def __init__(self, max_size: int, refresh_seconds: float, reload_seconds: float):
+        self.max_size = max_size
+        self.refresh_seconds = refresh_seconds
+        self.reload_seconds = reload_seconds
+        self.leaderboards = OrderedDict()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def query_entries(
+        session: Session, quiz_id: UUID4, updated_after: datetime = None
+    ) -> list:
+        """
+        Retrieves finished games of the quiz ordered by score
+        Args:
+            session: db session
+            quiz_id: quiz id
+            updated_after: optional time to retrieve only recently finished
+                or rescored games
+
+        Returns:
+            list of LeaderboardEntry objects
+
+        """
+        query = (
+            session.query(
+                Game.id, Game.user_id, Game.score, Game.finished_at, Game.updated_at
+            )
+            .filter(Game.quiz_id == quiz_id)
+            .filter(Game.finished.is_(True))
+        )
+        if updated_after:
+            query = query.filter(Game.updated_at >= updated_after)
+        return [
+            LeaderboardEntry(
+                game_id=game.id,
+                user_id=game.user_id,
+                score=game.score,
+                finished_at=game.finished_at,
+                updated_at=game.updated_at,
+            )
+            for game in query.order_by(Game.score.desc(), Game.finished_at)
+        ]
+
+    def get_leaderboard(self, session: Session, quiz_id: UUID4) -> Leaderboard:
+        """
+        Retrieves leaderboard of the quiz, loads it on first use and
+        picks up games finished by other workers or rescored after refresh interval
+        Args:
+            session: db session
+            quiz_id: quiz id
+
+        Returns:
+            Leaderboard object
+
+        """
+        now = time.monotonic()
+        with self.lock:
+            leaderboard = self.leaderboards.get(quiz_id)
+            if leaderboard:
+                self.leaderboards.move_to_end(quiz_id)
+                if leaderboard.loaded_at + self.reload_seconds < now:
+                    leaderboard = None
+                elif leaderboard.refreshed_at + self.refresh_seconds > now:
+                    return leaderboard
+
+        if leaderboard:
+            entries = self.query_entries(
+                session,
+                quiz_id,
+                leaderboard.watermark and leaderboard.watermark - REFRESH_OVERLAP,
+            )
+            with self.lock:
+                for entry in entries:
+                    leaderboard.add(entry)
+                leaderboard.refreshed_at = now
+            return leaderboard
+
+        leaderboard = Leaderboard(loaded_at=now, refreshed_at=now)
+        for entry in self.query_entries(session, quiz_id):
+            leaderboard.add(entry)
+        with self.lock:
+            self.leaderboards[quiz_id] = leaderboard
+            self.leaderboards.move_to_end(quiz_id)
+            while len(self.leaderboards) > self.max_size:
+                self.leaderboards.popitem(last=False)
+        return leaderboard
+
+    def top(self, session: Session, quiz_id: UUID4, limit: int) -> list:
+        """
+        Retrieves best games of the quiz
+        Args:
+            session: db session
+            quiz_id: quiz id
+            limit: number of games
+
+        Returns:
+            list of (rank, LeaderboardEntry)
+
+        """
+        leaderboard = self.get_leaderboard(session, quiz_id)
+        with self.lock:
+            entries = [
+                leaderboard.entries[game_id]
+                for _, _, game_id in leaderboard.keys[:limit]
+            ]
+            return [(leaderboard.rank(entry), entry) for entry in entries]
+
+    def user_rank(self, session: Session, quiz_id: UUID4, user_id: UUID4) -> tuple:
+        """
+        Retrieves rank of user finished game in the quiz
+        Args:
+            session: db session
+            quiz_id: quiz id
+            user_id: user id
+
+        Returns:
+            (rank, LeaderboardEntry) or None if user didn't finish game
+
+        """
+        leaderboard = self.get_leaderboard(session, quiz_id)
+        with self.lock:
+            entry = leaderboard.user_entries.get(user_id)
+            if not entry:
+                return None
+            return leaderboard.rank(entry), entry
+
+    def record_on_commit(self, session: Session, game) -> None:
+        """
+        Adds finished game to leaderboard once session is committed
+        Args:
+            session: db session
+            game: row containing quiz_id, id, user_id, score, finished_at
+                and updated_at of the game
+
+        """
+        session.info.setdefault("finished_games", []).append(game)
+
+    def record(self, game) -> None:
+        """
+        Adds finished game to already loaded leaderboard
+        Args:
+            game: row containing quiz_id, id, user_id, score, finished_at
+                and updated_at of the game
+
+        """
+        with self.lock:
+            leaderboard = self.leaderboards.get(game.quiz_id)
+            if leaderboard:
+                leaderboard.add(
+                    LeaderboardEntry(
+                        game_id=game.id,
+                        user_id=game.user_id,
+                        score=game.score,
+                        finished_at=game.finished_at,
+                        updated_at=game.updated_at,
+                    )
+                )
+
+    def invalidate(self, quiz_id: UUID4) -> None:
+        """
+        Removes quiz leaderboard from memory
+        Args:
+            quiz_id: quiz id
+
+        """
+        with self.lock:
+            self.leaderboards.pop(quiz_id, None)
+
+
+leaderboard_service = LeaderboardService(
+    int(app_config.get("LEADERBOARD_CACHE_SIZE", 256)),
+    float(app_config.get("LEADERBOARD_REFRESH_SECONDS", 5)),
+    float(app_config.get("LEADERBOARD_RELOAD_SECONDS", 300)),
+)
+
+
+@event.listens_for(Session, "after_transaction_create")
+def mark_finished_games(session: Session, transaction):
+    # savepoint rollback discards only games finished after the savepoint began
+    if transaction.nested:
+        session.info.setdefault("finished_games_marks", {})[transaction] = len(
+            session.info.get("finished_games", [])
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def record_finished_games(session: Session):
+    # released savepoint also fires after_commit, games wait for outer commit
+    if session.in_nested_transaction():
+        return
+    session.info.pop("finished_games_marks", None)
+    for game in session.info.pop("finished_games", []):
+        leaderboard_service.record(game)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_finished_games(session: Session, previous_transaction):
+    if previous_transaction.nested:
+        mark = session.info.get("finished_games_marks", {}).pop(
+            previous_transaction, None
+        )
+        if mark is not None:
+            del session.info.get("finished_games", [])[mark:]
+        return
+    session.info.pop("finished_games_marks", None)
+    session.info.pop("finished_games", None)
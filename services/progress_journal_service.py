@@ -0,0 +1,260 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable
+
+from fastapi import HTTPException
+from pydantic import UUID4
+from sqlalchemy import Boolean, Float, Integer, column, insert, not_, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session, sessionmaker
+
+from models.game_answer_model import GameAnswer
+from models.game_model import Game
+from models.game_question_model import GameQuestion
+from services.db_service import db_service
+from settings import app_config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProgressEntry:
+    game_id: UUID4
+    game_question_id: UUID4
+    score: float
+    choices: list
+    skipped: bool = False
+    # number of game questions and function finishing game after its last question
+    question_count: int | None = None
+    finish: Callable | None = None
+    future: Future = field(default_factory=Future)
+
+
+class ProgressJournalService:
+    def __init__(self, enabled: bool, window_ms: int, max_events: int):
+        self.enabled = enabled
+        self.window = window_ms / 1000
+        self.max_events = max_events
+        self.entries = []
+        self.condition = threading.Condition()
+        self.flusher = None
+        self.stopped = False
+
+    @staticmethod
+    def save_progress_batch(session: Session, entries: list) -> dict:
+        """
+        Marks many questions answered or skipped and moves their games forward
+        with multi-row statements. Only unanswered and not skipped questions are updated
+        Args:
+            session: db session
+            entries: list of ProgressEntry objects
+
+        Returns:
+            dict: new offset for every game, keyed by game question id of accepted entry
+
+        """
+        if not entries:
+            return {}
+        game_questions = GameQuestion.__table__
+        games = Game.__table__
+
+        progress = values(
+            column("id", UUID(as_uuid=True)),
+            column("game_id", UUID(as_uuid=True)),
+            column("answer_score", Float),
+            column("skipped", Boolean),
+            name="progress",
+        ).data(
+            [
+                (entry.game_question_id, entry.game_id, entry.score, entry.skipped)
+                for entry in entries
+            ]
+        )
+        accepted_ids = set(
+            session.execute(
+                update(game_questions)
+                .where(game_questions.c.id == progress.c.id)
+                .where(game_questions.c.game_id == progress.c.game_id)
+                .where(game_questions.c.answered.is_(False))
+                .where(game_questions.c.skipped.is_(False))
+                .values(
+                    answered=not_(progress.c.skipped),
+                    skipped=progress.c.skipped,
+                    answer_score=progress.c.answer_score,
+                )
+                .returning(game_questions.c.id)
+            ).scalars()
+        )
+        accepted_entries = [
+            entry for entry in entries if entry.game_question_id in accepted_ids
+        ]
+        if not accepted_entries:
+            return {}
+
+        game_deltas = defaultdict(lambda: [0, 0])
+        for entry in accepted_entries:
+            game_deltas[entry.game_id][0] += entry.score
+            game_deltas[entry.game_id][1] += 1
+        deltas = values(
+            column("id", UUID(as_uuid=True)),
+            column("score", Float),
+            column("steps", Integer),
+            name="deltas",
+        ).data(
+            [(game_id, score, steps) for game_id, (score, steps) in game_deltas.items()]
+        )
+        offsets = dict(
+            session.execute(
+                update(games)
+                .where(games.c.id == deltas.c.id)
+                .values(
+                    score=games.c.score + deltas.c.score,
+                    offset=games.c.offset + deltas.c.steps,
+                )
+                .returning(games.c.id, games.c.offset)
+            ).all()
+        )
+        game_answers = [
+            {"choice": choice, "game_question_id": entry.game_question_id}
+            for entry in accepted_entries
+            if not entry.skipped
+            for choice in entry.choices
+        ]
+        if game_answers:
+            session.execute(insert(GameAnswer.__table__), game_answers)
+        return {
+            entry.game_question_id: offsets[entry.game_id] for entry in accepted_entries
+        }
+
+    @staticmethod
+    def finish_games(session: Session, entries: dict, offsets: dict) -> None:
+        """
+        Finishes games whose last question is in the batch, in the batch transaction.
+        Every game is finished in its own savepoint, so game which can't be finished
+        doesn't fail the batch, such game is finished later by next question request
+        Args:
+            session: db session
+            entries: ProgressEntry objects keyed by game question id
+            offsets: new game offsets keyed by game question id of accepted entry
+
+        """
+        finished_game_ids = set()
+        for game_question_id, offset in offsets.items():
+            entry = entries[game_question_id]
+            if (
+                not entry.finish
+                or entry.game_id in finished_game_ids
+                or offset < entry.question_count
+            ):
+                continue
+            finished_game_ids.add(entry.game_id)
+            try:
+                with session.begin_nested():
+                    entry.finish(session)
+            except Exception:
+                logger.exception(
+                    f"Progress journal could not finish game {entry.game_id}"
+                )
+
+    def flush(self, entries: list) -> None:
+        """
+        Writes journal entries in one transaction, finishes games answered to the end
+        and resolves entry futures
+        Args:
+            entries: list of ProgressEntry objects
+
+        """
+        unique_entries = {}
+        for entry in entries:
+            if entry.game_question_id in unique_entries:
+                entry.future.set_exception(
+                    HTTPException(
+                        status_code=400, detail="Question already answered or skipped"
+                    )
+                )
+            else:
+                unique_entries[entry.game_question_id] = entry
+        try:
+            with sessionmaker(bind=db_service.engine)() as session:
+                offsets = self.save_progress_batch(
+                    session, list(unique_entries.values())
+                )
+                self.finish_games(session, unique_entries, offsets)
+                session.commit()
+        except Exception as exc:
+            logger.exception("Progress journal flush failed")
+            for entry in unique_entries.values():
+                entry.future.set_exception(exc)
+            return
+        for game_question_id, entry in unique_entries.items():
+            if game_question_id in offsets:
+                entry.future.set_result(offsets[game_question_id])
+            else:
+                entry.future.set_exception(
+                    HTTPException(
+                        status_code=400, detail="Question already answered or skipped"
+                    )
+                )
+
+    def run(self) -> None:
+        """
+        Flushes journal when group commit window passes or enough entries are collected
+        """
+        while True:
+            with self.condition:
+                while not self.entries and not self.stopped:
+                    self.condition.wait()
+                if not self.entries:
+                    return
+                deadline = time.monotonic() + self.window
+                while len(self.entries) < self.max_events and not self.stopped:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                entries, self.entries = self.entries, []
+            self.flush(entries)
+
+    def submit(self, entry: ProgressEntry) -> Future:
+        """
+        Adds progress entry to journal
+        Args:
+            entry: ProgressEntry object
+
+        Returns:
+            future resolved with new game offset once entry is committed
+
+        """
+        with self.condition:
+            if self.stopped:
+                raise HTTPException(status_code=503, detail="Server is shutting down")
+            if not self.flusher:
+                self.flusher = threading.Thread(
+                    target=self.run, name="progress-journal", daemon=True
+                )
+                self.flusher.start()
+            self.entries.append(entry)
+            if len(self.entries) == 1 or len(self.entries) >= self.max_events:
+                self.condition.notify()
+        return entry.future
+
+    def stop(self) -> None:
+        """
+        Flushes remaining entries and stops flusher thread
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        if self.flusher:
+            self.flusher.join()
+
+
+progress_journal_service = ProgressJournalService(
+    app_config.get("WRITE_BEHIND_ENABLED", "false").lower() == "true",
+    int(app_config.get("WRITE_BEHIND_WINDOW_MS", 10)),
+    int(app_config.get("WRITE_BEHIND_MAX_EVENTS", 500)),
+)
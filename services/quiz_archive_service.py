@@ -0,0 +1,277 @@
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from pydantic import UUID4
+from sqlalchemy import LargeBinary, delete, func, insert, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from models.answer_model import Answer
+from models.game_answer_model import GameAnswer
+from models.game_model import Game
+from models.game_question_model import GameQuestion
+from models.question_model import Question
+from models.quiz_archive_model import QuizArchive
+from models.quiz_model import Quiz
+from services.db_service import db_service
+from services.quiz_search_service import quiz_search_service
+from settings import app_config
+
+logger = logging.getLogger(__name__)
+
+# search columns are rebuilt when quiz is restored
+QUIZ_COLUMNS = [
+    column
+    for column in Quiz.__table__.columns
+    if column.name not in ("search_vector", "search_text")
+]
+RESTORE_CHUNK_SIZE = 1000
+# number of rows fetched from server side cursor at once while archiving
+ARCHIVE_FETCH_SIZE = 1000
+
+
+def decode_rows(table, rows: list) -> list:
+    """
+    Converts binary columns written as hex by encode_value back to bytes
+    Args:
+        table: sqlalchemy table of the rows
+        rows: archived rows
+
+    Returns:
+        list of rows ready to be inserted
+    """
+    binary_columns = [
+        column.name for column in table.columns if isinstance(column.type, LargeBinary)
+    ]
+    for row in rows:
+        for name in binary_columns:
+            if row.get(name) is not None:
+                row[name] = bytes.fromhex(row[name])
+    return rows
+
+
+def encode_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    raise TypeError(f"{type(value).__name__} can't be archived")
+
+
+class QuizArchiveService:
+    """
+    Moves deleted quizzes with their questions and game history out of hot tables.
+    Every quiz is stored as one compressed JSON document in quiz_archives table
+    """
+
+    def __init__(self, archive_after: timedelta, compression_level: int):
+        self.archive_after = archive_after
+        self.compression_level = compression_level
+
+    def archive_quiz(self, session: Session, quiz: dict) -> dict:
+        """
+        Builds compressed archive document of the quiz. Rows are streamed from server
+        side cursor and compressed as they are read, so memory doesn't grow with
+        number of games, only compressed document is kept
+        Args:
+            session: db session
+            quiz: quiz row
+
+        Returns:
+            dict: quiz_archives row
+        """
+        compressor = zlib.compressobj(self.compression_level)
+        parts = []
+
+        def write(text: str) -> None:
+            parts.append(compressor.compress(text.encode()))
+
+        def write_rows(query) -> int:
+            count = 0
+            for row in session.execute(
+                query.execution_options(
+                    stream_results=True, max_row_buffer=ARCHIVE_FETCH_SIZE
+                )
+            ).mappings():
+                write(
+                    ("," if count else "") + json.dumps(dict(row), default=encode_value)
+                )
+                count += 1
+            return count
+
+        quiz_id = quiz["id"]
+        write('{"quiz":' + json.dumps(quiz, default=encode_value))
+        write(',"questions":[')
+        write_rows(
+            select(*Question.__table__.columns)
+            .where(Question.quiz_id == quiz_id)
+            .order_by(Question.ordinal)
+        )
+        write('],"answers":[')
+        write_rows(
+            select(*Answer.__table__.columns)
+            .join(Question, Question.id == Answer.question_id)
+            .where(Question.quiz_id == quiz_id)
+        )
+        write('],"games":[')
+        game_count = write_rows(
+            select(*Game.__table__.columns).where(Game.quiz_id == quiz_id)
+        )
+        write('],"game_questions":[')
+        write_rows(
+            select(*GameQuestion.__table__.columns)
+            .join(Game, Game.id == GameQuestion.game_id)
+            .where(Game.quiz_id == quiz_id)
+        )
+        write('],"game_answers":[')
+        write_rows(
+            select(*GameAnswer.__table__.columns)
+            .join(GameQuestion, GameQuestion.id == GameAnswer.game_question_id)
+            .join(Game, Game.id == GameQuestion.game_id)
+            .where(Game.quiz_id == quiz_id)
+        )
+        write("]}")
+        parts.append(compressor.flush())
+        return {
+            "id": quiz_id,
+            "title": quiz["title"],
+            "user_id": quiz["user_id"],
+            "deleted_at": quiz["deleted_at"],
+            "game_count": game_count,
+            "payload": b"".join(parts),
+        }
+
+    def archive_batch(self, session: Session, batch_size: int) -> int:
+        """
+        Archives batch of quizzes deleted before archive_after period in one transaction.
+        Quizzes locked by another job are skipped
+        Args:
+            session: db session
+            batch_size: maximum number of archived quizzes
+
+        Returns:
+            int: number of archived quizzes
+        """
+        quizzes = session.execute(
+            select(*QUIZ_COLUMNS)
+            .where(Quiz.deleted.is_(True))
+            .where(
+                or_(
+                    Quiz.deleted_at.is_(None),
+                    Quiz.deleted_at <= func.now() - self.archive_after,
+                )
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).mappings()
+        quizzes = [dict(quiz) for quiz in quizzes]
+        if not quizzes:
+            return 0
+        quiz_ids = [quiz["id"] for quiz in quizzes]
+        for quiz in quizzes:
+            session.execute(
+                insert(QuizArchive.__table__), [self.archive_quiz(session, quiz)]
+            )
+
+        game_question_ids = (
+            select(GameQuestion.id)
+            .join(Game, Game.id == GameQuestion.game_id)
+            .where(Game.quiz_id.in_(quiz_ids))
+        )
+        question_ids = select(Question.id).where(Question.quiz_id.in_(quiz_ids))
+        session.execute(
+            delete(GameAnswer.__table__).where(
+                GameAnswer.game_question_id.in_(game_question_ids)
+            )
+        )
+        session.execute(
+            delete(GameQuestion.__table__).where(
+                GameQuestion.game_id.in_(
+                    select(Game.id).where(Game.quiz_id.in_(quiz_ids))
+                )
+            )
+        )
+        session.execute(delete(Game.__table__).where(Game.quiz_id.in_(quiz_ids)))
+        session.execute(
+            delete(Answer.__table__).where(Answer.question_id.in_(question_ids))
+        )
+        session.execute(
+            delete(Question.__table__).where(Question.quiz_id.in_(quiz_ids))
+        )
+        session.execute(delete(Quiz.__table__).where(Quiz.id.in_(quiz_ids)))
+        session.commit()
+        return len(quiz_ids)
+
+    def archive_deleted_quizzes(self, batch_size: int) -> int:
+        """
+        Archives all deleted quizzes in batches, every batch is committed separately
+        Args:
+            batch_size: number of quizzes archived in one transaction
+
+        Returns:
+            int: number of archived quizzes
+        """
+        archived_quizzes = 0
+        with sessionmaker(bind=db_service.engine)() as session:
+            while True:
+                archived = self.archive_batch(session, batch_size)
+                archived_quizzes += archived
+                if archived:
+                    logger.info(f"Archived {archived_quizzes} quizzes")
+                if archived < batch_size:
+                    return archived_quizzes
+
+    @staticmethod
+    def restore_quiz(session: Session, quiz_id: UUID4, undelete: bool = False) -> None:
+        """
+        Moves archived quiz with its game history back to hot tables
+        Args:
+            session: db session
+            quiz_id: quiz id
+            undelete: whether quiz is also marked as not deleted
+
+        """
+        archive = (
+            session.query(QuizArchive)
+            .filter(QuizArchive.id == quiz_id)
+            .with_for_update()
+            .first()
+        )
+        if not archive:
+            raise HTTPException(status_code=404, detail="Archived quiz not found")
+        document = json.loads(zlib.decompress(archive.payload))
+
+        session.execute(insert(Quiz.__table__), [document["quiz"]])
+        for table, rows in (
+            (Question.__table__, document["questions"]),
+            (Answer.__table__, document["answers"]),
+            (Game.__table__, document["games"]),
+            (GameQuestion.__table__, document["game_questions"]),
+            (GameAnswer.__table__, document["game_answers"]),
+        ):
+            rows = decode_rows(table, rows)
+            for start in range(0, len(rows), RESTORE_CHUNK_SIZE):
+                session.execute(insert(table), rows[start : start + RESTORE_CHUNK_SIZE])
+        session.delete(archive)
+
+        if undelete:
+            quizzes = Quiz.__table__
+            session.execute(
+                update(quizzes)
+                .where(quizzes.c.id == quiz_id)
+                .values(deleted=False, deleted_at=None)
+            )
+            if document["quiz"]["published"]:
+                quiz_search_service.index_quizzes(session, [quiz_id])
+        session.commit()
+
+
+quiz_archive_service = QuizArchiveService(
+    timedelta(days=float(app_config.get("QUIZ_ARCHIVE_AFTER_DAYS", 30))),
+    int(app_config.get("QUIZ_ARCHIVE_COMPRESSION_LEVEL", 6)),
+)
@@ -0,0 +1,115 @@
+from pydantic import UUID4
+from sqlalchemy import Float, cast, func, literal, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from models.question_model import Question
+from models.quiz_model import Quiz
+
+SEARCH_CONFIG = "english"
+
+
+class QuizSearchService:
+    """
+    Maintains search columns of published quizzes and searches them.
+    Published quizzes can't be changed, so quiz is indexed once when published
+    """
+
+    @staticmethod
+    def index_quizzes(session: Session, quiz_ids: list) -> None:
+        """
+        Fills search columns from quiz title and its question titles
+        Args:
+            session: db session
+            quiz_ids: ids of quizzes
+
+        """
+        quizzes = Quiz.__table__
+        question_titles = func.coalesce(
+            select(func.string_agg(Question.title, " "))
+            .where(Question.quiz_id == quizzes.c.id)
+            .scalar_subquery(),
+            "",
+        )
+        session.execute(
+            update(quizzes)
+            .where(quizzes.c.id.in_(quiz_ids))
+            .values(
+                search_vector=func.setweight(
+                    func.to_tsvector(SEARCH_CONFIG, quizzes.c.title), "A"
+                ).op("||")(
+                    func.setweight(
+                        func.to_tsvector(SEARCH_CONFIG, question_titles), "B"
+                    )
+                ),
+                search_text=quizzes.c.title + " " + question_titles,
+                updated_at=quizzes.c.updated_at,
+            )
+        )
+
+    @staticmethod
+    def remove_quiz(session: Session, quiz_id: UUID4) -> None:
+        """
+        Clears search columns, quiz is not found by search anymore
+        Args:
+            session: db session
+            quiz_id: quiz id
+
+        """
+        quizzes = Quiz.__table__
+        session.execute(
+            update(quizzes)
+            .where(quizzes.c.id == quiz_id)
+            .values(
+                search_vector=None,
+                search_text=None,
+                updated_at=quizzes.c.updated_at,
+            )
+        )
+
+    @staticmethod
+    def search(
+        session: Session, text: str, limit: int, after: tuple | None = None
+    ) -> list:
+        """
+        Searches published quizzes by words using full text search and by
+        similar words using trigrams, so misspelled words are found too
+        Args:
+            session: db session
+            text: searched text
+            limit: number of quizzes
+            after: (rank, id) of last quiz of previous page
+
+        Returns:
+            list of quizzes ordered by rank
+
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+        rank = cast(
+            func.ts_rank_cd(Quiz.search_vector, ts_query)
+            + func.word_similarity(text, Quiz.search_text),
+            Float,
+        )
+        query = (
+            session.query(
+                Quiz.id,
+                Quiz.title,
+                Quiz.created_at,
+                Quiz.question_count,
+                Quiz.games_started,
+                Quiz.games_finished,
+                Quiz.average_score.label("average_score"),
+                rank.label("rank"),
+            )
+            .filter(
+                Quiz.search_vector.op("@@")(ts_query)
+                | literal(text).op("<%")(Quiz.search_text)
+            )
+            .filter(Quiz.published.is_(True))
+            .filter(Quiz.deleted.is_(False))
+        )
+        if after:
+            query = query.filter(tuple_(rank, Quiz.id) < tuple_(*after))
+        return query.order_by(rank.desc(), Quiz.id.desc()).limit(limit).all()
+
+
+quiz_search_service = QuizSearchService()
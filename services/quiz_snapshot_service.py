@@ -0,0 +1,227 @@
+import random
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+
+from pydantic import UUID4
+from sqlalchemy.orm import Session
+
+from helpers.content_helper import question_content_hash
+from models.question_model import Question
+from settings import app_config
+
+
+@dataclass(frozen=True)
+class AnswerSnapshot:
+    id: UUID4
+    value: str
+
+
+@dataclass(frozen=True)
+class QuestionSnapshot:
+    id: UUID4
+    title: str
+    type: str
+    answers: tuple[AnswerSnapshot, ...]
+    correct_answers: frozenset
+    false_answers: frozenset
+    content_hash: bytes | None = None
+
+
+@dataclass(frozen=True)
+class QuizSnapshot:
+    quiz_id: UUID4
+    questions: tuple[QuestionSnapshot, ...]
+    questions_by_id: MappingProxyType
+
+    def get_question(self, question_id: UUID4) -> QuestionSnapshot | None:
+        return self.questions_by_id.get(question_id)
+
+    def sample_questions(self, sample_size: int | None) -> tuple[QuestionSnapshot, ...]:
+        """
+        Draws random questions for one game. Questions are picked by their positions,
+        so cost depends on sample size and not on number of quiz questions
+        Args:
+            sample_size: number of questions in game, None means all questions
+
+        Returns:
+            tuple of questions in order they are asked
+        """
+        if not sample_size or sample_size >= len(self.questions):
+            return self.questions
+        return tuple(
+            self.questions[position]
+            for position in random.sample(range(len(self.questions)), sample_size)
+        )
+
+
+class QuizSnapshotService:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.snapshots = OrderedDict()
+        # texts of cached questions by content hash: [title, answer values, references]
+        self.contents = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def build_snapshot(session: Session, quiz_id: UUID4) -> QuizSnapshot:
+        """
+        Compiles read-only snapshot of quiz questions and answers
+        Args:
+            session: db session
+            quiz_id: quiz id
+
+        Returns:
+            QuizSnapshot object
+
+        """
+        questions = []
+        for question in (
+            session.query(Question)
+            .filter(Question.quiz_id == quiz_id)
+            .order_by(Question.ordinal)
+        ):
+            questions.append(
+                QuestionSnapshot(
+                    id=question.id,
+                    title=question.title,
+                    type=question.type,
+                    answers=tuple(
+                        AnswerSnapshot(id=answer.id, value=answer.value)
+                        for answer in question.answers
+                    ),
+                    correct_answers=frozenset(
+                        answer.id for answer in question.answers if answer.is_correct
+                    ),
+                    false_answers=frozenset(
+                        answer.id
+                        for answer in question.answers
+                        if not answer.is_correct
+                    ),
+                    content_hash=question_content_hash(
+                        question.title or "",
+                        question.type or "",
+                        (
+                            (answer.value or "", answer.is_correct)
+                            for answer in question.answers
+                        ),
+                    ),
+                )
+            )
+        return QuizSnapshot(
+            quiz_id=quiz_id,
+            questions=tuple(questions),
+            questions_by_id=MappingProxyType(
+                {question.id: question for question in questions}
+            ),
+        )
+
+    def get_snapshot(self, session: Session, quiz_id: UUID4) -> QuizSnapshot:
+        """
+        Retrieves snapshot of published quiz, builds it on first use
+        Args:
+            session: db session
+            quiz_id: quiz id
+
+        Returns:
+            QuizSnapshot object
+
+        """
+        with self.lock:
+            snapshot = self.snapshots.get(quiz_id)
+            if snapshot:
+                self.snapshots.move_to_end(quiz_id)
+                return snapshot
+
+        snapshot = self.build_snapshot(session, quiz_id)
+        with self.lock:
+            cached_snapshot = self.snapshots.get(quiz_id)
+            if cached_snapshot:
+                self.snapshots.move_to_end(quiz_id)
+                return cached_snapshot
+            snapshot = self.share_contents(snapshot)
+            self.snapshots[quiz_id] = snapshot
+            while len(self.snapshots) > self.max_size:
+                _, evicted_snapshot = self.snapshots.popitem(last=False)
+                self.release_contents(evicted_snapshot)
+        return snapshot
+
+    def share_contents(self, snapshot: QuizSnapshot) -> QuizSnapshot:
+        """
+        Makes questions copied between quizzes reuse title and answer strings
+        of already cached copy, so text of cached question copies is kept in worker
+        memory once. Rows in DB are not affected.
+        Must be called with lock held
+        Args:
+            snapshot: newly built snapshot
+
+        Returns:
+            QuizSnapshot object sharing texts with cached snapshots
+        """
+        questions = []
+        for question in snapshot.questions:
+            if not question.content_hash:
+                questions.append(question)
+                continue
+            content = self.contents.get(question.content_hash)
+            if not content:
+                content = self.contents[question.content_hash] = [
+                    question.title,
+                    {answer.value: answer.value for answer in question.answers},
+                    0,
+                ]
+            content[2] += 1
+            title, values, _ = content
+            questions.append(
+                replace(
+                    question,
+                    title=title if title == question.title else question.title,
+                    answers=tuple(
+                        AnswerSnapshot(
+                            id=answer.id, value=values.get(answer.value, answer.value)
+                        )
+                        for answer in question.answers
+                    ),
+                )
+            )
+        return QuizSnapshot(
+            quiz_id=snapshot.quiz_id,
+            questions=tuple(questions),
+            questions_by_id=MappingProxyType(
+                {question.id: question for question in questions}
+            ),
+        )
+
+    def release_contents(self, snapshot: QuizSnapshot) -> None:
+        """
+        Forgets texts which are no longer used by any cached snapshot.
+        Must be called with lock held
+        Args:
+            snapshot: snapshot removed from cache
+
+        """
+        for question in snapshot.questions:
+            content = self.contents.get(question.content_hash)
+            if not content:
+                continue
+            content[2] -= 1
+            if content[2] <= 0:
+                del self.contents[question.content_hash]
+
+    def invalidate(self, quiz_id: UUID4) -> None:
+        """
+        Removes quiz snapshot from cache
+        Args:
+            quiz_id: quiz id
+
+        """
+        with self.lock:
+            snapshot = self.snapshots.pop(quiz_id, None)
+            if snapshot:
+                self.release_contents(snapshot)
+
+
+quiz_snapshot_service = QuizSnapshotService(
+    int(app_config.get("QUIZ_SNAPSHOT_CACHE_SIZE", 1024))
+)
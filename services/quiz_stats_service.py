@@ -0,0 +1,250 @@
+import logging
+import threading
+
+from pydantic import UUID4
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from models.game_model import Game
+from models.question_model import Question
+from models.quiz_model import Quiz
+from models.quiz_stat_delta_model import QuizStatDelta
+from services.db_service import db_service
+from settings import app_config
+
+logger = logging.getLogger(__name__)
+
+# only one worker applies deltas at a time, so quiz rows are never locked in two orders
+APPLY_DELTAS_LOCK_ID = 7_341_902
+
+
+class QuizStatsService:
+    """
+    Maintains question and game counters stored on quiz row.
+    Question counters are updated in transaction of the change they count.
+    Game counters are written as rows of quiz_stat_deltas in transaction of the game,
+    so games don't wait for lock of quiz row, and deltas are added to quiz rows in batches.
+    updated_at is kept as it tracks changes of quiz content
+    """
+
+    def __init__(self, apply_seconds: float, batch_size: int):
+        self.apply_seconds = apply_seconds
+        self.batch_size = batch_size
+        self.applier = None
+        self.stopped = threading.Event()
+
+    @staticmethod
+    def add_questions(
+        session: Session, quiz_id: UUID4, count: int, max_count: int
+    ) -> int | None:
+        """
+        Increases number of quiz questions unless it would exceed maximum
+        Args:
+            session: db session
+            quiz_id: quiz id
+            count: number of added questions
+            max_count: maximum number of questions, number or SQL expression over quiz row
+
+        Returns:
+            int: number of questions before adding, None if maximum is exceeded
+
+        """
+        quizzes = Quiz.__table__
+        updated_quiz = session.execute(
+            update(quizzes)
+            .where(quizzes.c.id == quiz_id)
+            .where(quizzes.c.question_count + count <= max_count)
+            .values(
+                question_count=quizzes.c.question_count + count,
+                updated_at=quizzes.c.updated_at,
+            )
+            .returning(quizzes.c.question_count)
+        ).first()
+        if not updated_quiz:
+            return None
+        return updated_quiz.question_count - count
+
+    @staticmethod
+    def remove_question(session: Session, quiz_id: UUID4) -> None:
+        quizzes = Quiz.__table__
+        session.execute(
+            update(quizzes)
+            .where(quizzes.c.id == quiz_id)
+            .values(
+                question_count=quizzes.c.question_count - 1,
+                updated_at=quizzes.c.updated_at,
+            )
+        )
+
+    @staticmethod
+    def game_started(session: Session, quiz_id: UUID4) -> None:
+        session.execute(
+            insert(QuizStatDelta.__table__).values(quiz_id=quiz_id, games_started=1)
+        )
+
+    @staticmethod
+    def game_finished(session: Session, quiz_id: UUID4, score: float) -> None:
+        session.execute(
+            insert(QuizStatDelta.__table__).values(
+                quiz_id=quiz_id, games_finished=1, finished_score_sum=score
+            )
+        )
+
+    @staticmethod
+    def apply_deltas_batch(session: Session, batch_size: int) -> int | None:
+        """
+        Moves batch of game counter deltas to quiz rows with one statement,
+        every quiz row is updated once per batch
+        Args:
+            session: db session
+            batch_size: maximum number of applied deltas
+
+        Returns:
+            int: number of applied deltas, None if another worker is applying them
+        """
+        if not session.execute(
+            select(func.pg_try_advisory_xact_lock(APPLY_DELTAS_LOCK_ID))
+        ).scalar():
+            return None
+        deltas = QuizStatDelta.__table__
+        quizzes = Quiz.__table__
+        taken_deltas = (
+            delete(deltas)
+            .where(
+                deltas.c.id.in_(
+                    select(deltas.c.id).order_by(deltas.c.id).limit(batch_size)
+                )
+            )
+            .returning(
+                deltas.c.quiz_id,
+                deltas.c.games_started,
+                deltas.c.games_finished,
+                deltas.c.finished_score_sum,
+            )
+            .cte("taken_deltas")
+        )
+        totals = (
+            select(
+                taken_deltas.c.quiz_id,
+                func.count().label("delta_count"),
+                func.sum(taken_deltas.c.games_started).label("games_started"),
+                func.sum(taken_deltas.c.games_finished).label("games_finished"),
+                func.sum(taken_deltas.c.finished_score_sum).label("finished_score_sum"),
+            )
+            .group_by(taken_deltas.c.quiz_id)
+            .subquery("totals")
+        )
+        applied = session.execute(
+            update(quizzes)
+            .where(quizzes.c.id == totals.c.quiz_id)
+            .values(
+                games_started=quizzes.c.games_started + totals.c.games_started,
+                games_finished=quizzes.c.games_finished + totals.c.games_finished,
+                finished_score_sum=quizzes.c.finished_score_sum
+                + totals.c.finished_score_sum,
+                updated_at=quizzes.c.updated_at,
+            )
+            .returning(totals.c.delta_count)
+        ).scalars()
+        applied_deltas = sum(applied)
+        session.commit()
+        return applied_deltas
+
+    def apply_deltas(self) -> int:
+        """
+        Applies all pending game counter deltas in batches,
+        every batch is committed separately
+        Returns:
+            int: number of applied deltas
+        """
+        applied_deltas = 0
+        with sessionmaker(bind=db_service.engine)() as session:
+            while True:
+                applied = self.apply_deltas_batch(session, self.batch_size)
+                if not applied:
+                    return applied_deltas
+                applied_deltas += applied
+                if applied < self.batch_size:
+                    return applied_deltas
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.apply_seconds):
+            try:
+                self.apply_deltas()
+            except Exception:
+                logger.exception("Applying quiz stat deltas failed")
+
+    def start(self) -> None:
+        """
+        Starts thread applying game counter deltas periodically
+        """
+        if not self.applier:
+            self.stopped.clear()
+            self.applier = threading.Thread(
+                target=self.run, name="quiz-stats", daemon=True
+            )
+            self.applier.start()
+
+    def stop(self) -> None:
+        """
+        Stops applier thread and applies remaining deltas
+        """
+        if self.applier:
+            self.stopped.set()
+            self.applier.join()
+            self.applier = None
+            try:
+                self.apply_deltas()
+            except Exception:
+                logger.exception("Applying quiz stat deltas failed")
+
+    @staticmethod
+    def recalculate(session: Session, quiz_id: UUID4) -> None:
+        """
+        Recalculates all counters of the quiz from its questions and games.
+        Pending deltas of the quiz are dropped in same statement, so games are
+        counted from same snapshot and none of them is counted twice
+        Args:
+            session: db session
+            quiz_id: quiz id
+
+        """
+        deltas = QuizStatDelta.__table__
+        dropped_deltas = (
+            delete(deltas)
+            .where(deltas.c.quiz_id == quiz_id)
+            .returning(deltas.c.id)
+            .cte("dropped_deltas")
+        )
+        quizzes = Quiz.__table__
+        finished_games = select(Game.score).where(Game.quiz_id == quiz_id)
+        finished_games = finished_games.where(Game.finished.is_(True)).subquery()
+        session.execute(
+            update(quizzes)
+            .where(quizzes.c.id == quiz_id)
+            # references CTE, so deltas are deleted by this statement
+            .where(
+                select(func.count()).select_from(dropped_deltas).scalar_subquery() >= 0
+            )
+            .values(
+                question_count=select(func.count())
+                .where(Question.quiz_id == quiz_id)
+                .scalar_subquery(),
+                games_started=select(func.count())
+                .where(Game.quiz_id == quiz_id)
+                .scalar_subquery(),
+                games_finished=select(func.count())
+                .select_from(finished_games)
+                .scalar_subquery(),
+                finished_score_sum=select(
+                    func.coalesce(func.sum(finished_games.c.score), 0)
+                ).scalar_subquery(),
+                updated_at=quizzes.c.updated_at,
+            )
+        )
+
+
+quiz_stats_service = QuizStatsService(
+    float(app_config.get("QUIZ_STATS_APPLY_SECONDS", 2)),
+    int(app_config.get("QUIZ_STATS_BATCH_SIZE", 10000)),
+)
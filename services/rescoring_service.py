@@ -0,0 +1,242 @@
+import logging
+from dataclasses import dataclass
+
+import numpy as np
+from pydantic import UUID4
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from models.game_answer_model import GameAnswer
+from models.game_model import Game
+from models.game_question_model import GameQuestion
+from schemas.question_schema import QuestionTypeEnum
+from services.db_service import db_service
+from services.quiz_snapshot_service import quiz_snapshot_service, QuizSnapshot
+from services.quiz_stats_service import quiz_stats_service
+
+logger = logging.getLogger(__name__)
+
+# number of set bits for every possible choices mask, questions have at most 5 answers
+POPCOUNT = np.array([bin(mask).count("1") for mask in range(256)], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    question_indexes: dict
+    answer_bits: dict
+    correct_masks: np.ndarray
+    false_masks: np.ndarray
+    correct_counts: np.ndarray
+    false_counts: np.ndarray
+    single_answer: np.ndarray
+
+
+class RescoringService:
+    @staticmethod
+    def build_answer_key(snapshot: QuizSnapshot) -> AnswerKey:
+        """
+        Encodes quiz answers as bitmasks, one bit per answer of the question
+        Args:
+            snapshot: quiz snapshot
+
+        Returns:
+            AnswerKey with per question masks and counts
+
+        """
+        answer_bits = {}
+        correct_masks = np.zeros(len(snapshot.questions), dtype=np.uint8)
+        false_masks = np.zeros(len(snapshot.questions), dtype=np.uint8)
+        for index, question in enumerate(snapshot.questions):
+            for bit, answer in enumerate(question.answers):
+                answer_bits[str(answer.id)] = 1 << bit
+                if answer.id in question.correct_answers:
+                    correct_masks[index] |= 1 << bit
+                else:
+                    false_masks[index] |= 1 << bit
+        return AnswerKey(
+            question_indexes={
+                question.id: index for index, question in enumerate(snapshot.questions)
+            },
+            answer_bits=answer_bits,
+            correct_masks=correct_masks,
+            false_masks=false_masks,
+            correct_counts=POPCOUNT[correct_masks],
+            false_counts=POPCOUNT[false_masks],
+            single_answer=np.array(
+                [
+                    question.type == QuestionTypeEnum.SINGLE_ANSWER.value
+                    for question in snapshot.questions
+                ],
+                dtype=bool,
+            ),
+        )
+
+    @staticmethod
+    def encode_choices(answer_key: AnswerKey, choices: list) -> int:
+        """
+        Encodes user choices as bitmask
+        Args:
+            answer_key: answer key of the quiz
+            choices: choices user made as stored in game answers
+
+        Returns:
+            int: choices mask
+
+        """
+        mask = 0
+        for choice in choices:
+            mask |= answer_key.answer_bits.get(choice, 0)
+        return mask
+
+    @staticmethod
+    def score_masks(
+        answer_key: AnswerKey, question_indexes: np.ndarray, choice_masks: np.ndarray
+    ) -> np.ndarray:
+        """
+        Calculates scores for many answered questions at once.
+        Gives same results as GameController.calculate_answer_score
+        Args:
+            answer_key: answer key of the quiz
+            question_indexes: index of answered question in quiz
+            choice_masks: choices user made encoded as bitmasks
+
+        Returns:
+            array of scores
+
+        """
+        correct_masks = answer_key.correct_masks[question_indexes]
+        false_masks = answer_key.false_masks[question_indexes]
+        correct_counts = answer_key.correct_counts[question_indexes]
+        false_counts = answer_key.false_counts[question_indexes]
+
+        single_scores = np.where(choice_masks & correct_masks, 1.0, -1.0)
+        plus_scores = POPCOUNT[choice_masks & correct_masks] / correct_counts
+        minus_scores = np.divide(
+            POPCOUNT[choice_masks & false_masks],
+            false_counts,
+            out=np.zeros(len(false_counts)),
+            where=false_counts > 0,
+        )
+        return np.where(
+            answer_key.single_answer[question_indexes],
+            single_scores,
+            plus_scores - minus_scores,
+        )
+
+    def rescore_games(
+        self, session: Session, answer_key: AnswerKey, game_ids: list
+    ) -> int:
+        """
+        Recalculates answer scores of the games and writes them back with total scores.
+        Stored results are cleared, they are rebuilt when requested next time
+        Args:
+            session: db session
+            answer_key: answer key of the quiz
+            game_ids: ids of games to rescore
+
+        Returns:
+            int: number of rescored game questions
+
+        """
+        game_questions = (
+            session.query(
+                GameQuestion.id,
+                GameQuestion.question_id,
+                func.array_agg(GameAnswer.choice).label("choices"),
+            )
+            .join(GameAnswer, GameAnswer.game_question_id == GameQuestion.id)
+            .filter(GameQuestion.game_id.in_(game_ids))
+            .filter(GameQuestion.answered.is_(True))
+            .group_by(GameQuestion.id)
+            .all()
+        )
+        game_questions = [
+            game_question
+            for game_question in game_questions
+            if game_question.question_id in answer_key.question_indexes
+        ]
+        if game_questions:
+            question_indexes = np.fromiter(
+                (
+                    answer_key.question_indexes[game_question.question_id]
+                    for game_question in game_questions
+                ),
+                dtype=np.intp,
+                count=len(game_questions),
+            )
+            choice_masks = np.fromiter(
+                (
+                    self.encode_choices(answer_key, game_question.choices)
+                    for game_question in game_questions
+                ),
+                dtype=np.uint8,
+                count=len(game_questions),
+            )
+            scores = self.score_masks(answer_key, question_indexes, choice_masks)
+
+            game_questions_table = GameQuestion.__table__
+            session.execute(
+                update(game_questions_table)
+                .where(game_questions_table.c.id == bindparam("game_question_id"))
+                .values(answer_score=bindparam("new_answer_score")),
+                [
+                    {"game_question_id": game_question.id, "new_answer_score": score}
+                    for game_question, score in zip(game_questions, scores.tolist())
+                ],
+            )
+
+        totals = (
+            session.query(
+                GameQuestion.game_id.label("game_id"),
+                func.coalesce(func.sum(GameQuestion.answer_score), 0).label("score"),
+            )
+            .filter(GameQuestion.game_id.in_(game_ids))
+            .group_by(GameQuestion.game_id)
+            .subquery()
+        )
+        games = Game.__table__
+        session.execute(
+            update(games)
+            .where(games.c.id == totals.c.game_id)
+            .values(score=totals.c.score, results=None)
+        )
+        return len(game_questions)
+
+    def rescore_quiz(self, quiz_id: UUID4, batch_size: int = 1000) -> int:
+        """
+        Recalculates scores of all games played in the quiz in batches of games
+        Args:
+            quiz_id: quiz id
+            batch_size: number of games rescored and committed at once
+
+        Returns:
+            int: number of rescored games
+
+        """
+        with sessionmaker(bind=db_service.engine)() as session:
+            snapshot = quiz_snapshot_service.build_snapshot(session, quiz_id)
+            answer_key = self.build_answer_key(snapshot)
+            rescored_games = 0
+            last_game_id = None
+            while True:
+                query = session.query(Game.id).filter(Game.quiz_id == quiz_id)
+                if last_game_id:
+                    query = query.filter(Game.id > last_game_id)
+                game_ids = [
+                    game.id for game in query.order_by(Game.id).limit(batch_size)
+                ]
+                if not game_ids:
+                    break
+                rescored_questions = self.rescore_games(session, answer_key, game_ids)
+                session.commit()
+                rescored_games += len(game_ids)
+                last_game_id = game_ids[-1]
+                logger.info(
+                    f"Rescored {rescored_games} games ({rescored_questions} questions in batch)"
+                )
+            quiz_stats_service.recalculate(session, quiz_id)
+            session.commit()
+            return rescored_games
+
+
+rescoring_service = RescoringService()
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException, WebSocket
+from fastapi.encoders import jsonable_encoder
+from pydantic import UUID4
+
+from services.quiz_snapshot_service import QuizSnapshot, QuestionSnapshot
+from settings import app_config
+
+logger = logging.getLogger(__name__)
+
+# how often rooms are checked for idleness
+ROOM_SWEEP_SECONDS = 30
+
+
+@dataclass
+class RoomPlayer:
+    user_id: UUID4
+    username: str
+    game_id: UUID4
+    game_question_ids: dict
+    question_count: int
+    score: float = 0
+    websocket: WebSocket | None = None
+
+
+@dataclass
+class Room:
+    id: UUID4
+    host_id: UUID4
+    snapshot: QuizSnapshot
+    questions: tuple[QuestionSnapshot, ...]
+    players: dict = field(default_factory=dict)
+    answers: dict = field(default_factory=dict)
+    question_index: int = -1
+    question_open: bool = False
+    question_payload: str | None = None
+    finished: bool = False
+    host_websockets: set = field(default_factory=set)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # monotonic time of last host or player action and of host losing all sockets
+    active_at: float = field(default_factory=time.monotonic)
+    host_left_at: float | None = field(default_factory=time.monotonic)
+
+    @property
+    def question(self) -> QuestionSnapshot:
+        return self.questions[self.question_index]
+
+    @property
+    def has_next_question(self) -> bool:
+        return self.question_index + 1 < len(self.questions)
+
+    @property
+    def closed_questions(self) -> int:
+        """Number of questions which can't be answered anymore"""
+        return self.question_index + (0 if self.question_open else 1)
+
+    def touch(self) -> None:
+        self.active_at = time.monotonic()
+
+
+class RoomService:
+    def __init__(self, send_timeout: float, idle_timeout: float, host_timeout: float):
+        self.send_timeout = send_timeout
+        self.idle_timeout = idle_timeout
+        self.host_timeout = host_timeout
+        self.rooms = {}
+        self.sweeper = None
+
+    @staticmethod
+    def encode(message: dict) -> str:
+        """
+        Serializes message sent to room sockets
+        Args:
+            message: message to send
+
+        Returns:
+            str: json payload
+        """
+        return json.dumps(jsonable_encoder(message))
+
+    def create_room(
+        self,
+        host_id: UUID4,
+        snapshot: QuizSnapshot,
+        questions: tuple[QuestionSnapshot, ...],
+    ) -> Room:
+        """
+        Creates room for published quiz in memory of current worker
+        Args:
+            host_id: id of user driving the room
+            snapshot: snapshot of room quiz
+            questions: questions asked in the room, same for all players
+
+        Returns:
+            Room object
+        """
+        room = Room(
+            id=uuid.uuid4(), host_id=host_id, snapshot=snapshot, questions=questions
+        )
+        self.rooms[room.id] = room
+        return room
+
+    def get_room(self, room_id: UUID4) -> Room:
+        """
+        Retrieves room by id
+        Args:
+            room_id: room id
+
+        Returns:
+            Room object
+        """
+        room = self.rooms.get(room_id)
+        if not room:
+            raise HTTPException(status_code=404, detail="Room not found")
+        return room
+
+    def remove_room(self, room: Room) -> None:
+        """
+        Removes room from memory
+        Args:
+            room: room
+        """
+        self.rooms.pop(room.id, None)
+
+    def is_expired(self, room: Room, now: float) -> bool:
+        """
+        Checks whether room is idle or its host is gone for too long
+        Args:
+            room: room
+            now: monotonic time
+
+        Returns:
+            bool: whether room must be removed
+        """
+        if room.active_at + self.idle_timeout < now:
+            return True
+        return (
+            room.host_left_at is not None
+            and room.host_left_at + self.host_timeout < now
+        )
+
+    async def evict_rooms(self) -> None:
+        """
+        Removes expired rooms, their players are told that room is closed
+        and their sockets are closed
+        """
+        now = time.monotonic()
+        for room in [
+            room for room in self.rooms.values() if self.is_expired(room, now)
+        ]:
+            logger.info(f"Removing inactive room {room.id}")
+            room.finished = True
+            self.remove_room(room)
+            await self.broadcast(
+                room, {"event": "closed", "standings": self.standings(room)}
+            )
+            await self.close(room)
+
+    async def sweep(self) -> None:
+        while True:
+            await asyncio.sleep(ROOM_SWEEP_SECONDS)
+            try:
+                await self.evict_rooms()
+            except Exception:
+                logger.exception("Room sweep failed")
+
+    def start(self) -> None:
+        """
+        Starts background task removing inactive rooms
+        """
+        if not self.sweeper:
+            self.sweeper = asyncio.create_task(self.sweep())
+
+    def stop(self) -> None:
+        """
+        Stops background task removing inactive rooms
+        """
+        if self.sweeper:
+            self.sweeper.cancel()
+            self.sweeper = None
+
+    @staticmethod
+    def connect_host(room: Room, websocket: WebSocket) -> None:
+        """
+        Attaches host socket to room
+        Args:
+            room: room
+            websocket: host socket
+        """
+        room.host_websockets.add(websocket)
+        room.host_left_at = None
+        room.touch()
+
+    @staticmethod
+    def connect(room: Room, player: RoomPlayer, websocket: WebSocket) -> None:
+        """
+        Attaches socket to player, socket of previous connection stops receiving messages
+        Args:
+            room: room
+            player: player joined the room
+            websocket: player socket
+        """
+        player.websocket = websocket
+        room.players[player.user_id] = player
+        room.touch()
+
+    @staticmethod
+    def disconnect(room: Room, websocket: WebSocket) -> None:
+        """
+        Detaches closed socket from room, players keep their scores
+        Args:
+            room: room
+            websocket: closed socket
+        """
+        if websocket in room.host_websockets:
+            room.host_websockets.discard(websocket)
+            if not room.host_websockets:
+                room.host_left_at = time.monotonic()
+        for player in room.players.values():
+            if player.websocket is websocket:
+                player.websocket = None
+
+    async def send(self, websocket: WebSocket, payload: str) -> bool:
+        """
+        Sends already serialized payload to socket
+        Args:
+            websocket: socket
+            payload: json payload
+
+        Returns:
+            bool: whether payload was sent in time
+        """
+        try:
+            await asyncio.wait_for(websocket.send_text(payload), self.send_timeout)
+        except Exception:
+            logger.warning("Dropping room socket which failed to receive message")
+            return False
+        return True
+
+    async def broadcast(self, room: Room, message: dict) -> None:
+        """
+        Serializes message once and sends it to host and all players
+        Args:
+            room: room
+            message: message to send
+        """
+        await self.broadcast_payload(room, self.encode(message))
+
+    async def broadcast_payload(self, room: Room, payload: str) -> None:
+        """
+        Sends serialized payload to host and all players concurrently.
+        Sockets which fail to receive message are detached from room
+        Args:
+            room: room
+            payload: json payload
+        """
+        websockets = list(room.host_websockets) + [
+            player.websocket for player in room.players.values() if player.websocket
+        ]
+        sent = await asyncio.gather(
+            *(self.send(websocket, payload) for websocket in websockets)
+        )
+        for websocket, is_sent in zip(websockets, sent):
+            if not is_sent:
+                self.disconnect(room, websocket)
+
+    async def close(self, room: Room) -> None:
+        """
+        Closes all sockets of the room
+        Args:
+            room: room
+        """
+        websockets = list(room.host_websockets) + [
+            player.websocket for player in room.players.values() if player.websocket
+        ]
+        await asyncio.gather(
+            *(websocket.close() for websocket in websockets), return_exceptions=True
+        )
+
+    @staticmethod
+    def open_question(room: Room) -> dict:
+        """
+        Moves room to next question and starts accepting answers
+        Args:
+            room: room
+
+        Returns:
+            dict: question message
+        """
+        room.question_index += 1
+        room.question_open = True
+        room.answers = {}
+        question = room.question
+        return {
+            "event": "question",
+            "index": room.question_index,
+            "total": len(room.questions),
+            "question": {
+                "question_id": question.id,
+                "type": question.type,
+                "title": question.title,
+                "answers": [
+                    {"id": answer.id, "value": answer.value}
+                    for answer in question.answers
+                ],
+            },
+        }
+
+    @staticmethod
+    def close_question(room: Room) -> dict:
+        """
+        Stops accepting answers for current question
+        Args:
+            room: room
+
+        Returns:
+            dict: collected answers as (score, choices) keyed by user id
+        """
+        room.question_open = False
+        room.question_payload = None
+        answers, room.answers = room.answers, {}
+        return answers
+
+    @staticmethod
+    def reopen_question(
+        room: Room, answers: dict, question_payload: str | None
+    ) -> None:
+        """
+        Reopens question whose answers could not be saved, answers are kept
+        Args:
+            room: room
+            answers: answers taken by close_question
+            question_payload: question message sent to joining players
+
+        """
+        room.question_open = True
+        room.question_payload = question_payload
+        room.answers = {**answers, **room.answers}
+
+    @staticmethod
+    def standings(room: Room) -> list:
+        """
+        Ranks room players by score, players with equal score share same rank
+        Args:
+            room: room
+
+        Returns:
+            list of dicts containing rank, username and score
+        """
+        players = sorted(
+            room.players.values(), key=lambda player: (-player.score, player.username)
+        )
+        standings = []
+        for index, player in enumerate(players):
+            rank = index + 1
+            if standings and standings[-1]["score"] == round(player.score, 3):
+                rank = standings[-1]["rank"]
+            standings.append(
+                {
+                    "rank": rank,
+                    "username": player.username,
+                    "score": round(player.score, 3),
+                }
+            )
+        return standings
+
+
+room_service = RoomService(
+    float(app_config.get("ROOM_SEND_TIMEOUT_SECONDS", 5)),
+    float(app_config.get("ROOM_IDLE_SECONDS", 1800)),
+    float(app_config.get("ROOM_HOST_TIMEOUT_SECONDS", 300)),
+)